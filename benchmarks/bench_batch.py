@@ -0,0 +1,63 @@
+"""
+Compare a markdown.markdown call per document with convertMany on many
+small documents of one swagger file.
+
+Run from the root of the repository:
+
+    python benchmarks/bench_batch.py
+
+convertMany reuses one Markdown instance, markdown.markdown builds a new
+one, with its extension and preprocessor, for every document.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import markdown
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from specgen import generateSpec
+from swaggermarkdown import convertMany
+from swaggermarkdown.swaggermarkdown import SwaggerExtension
+from swaggermarkdown.spec import specCache
+
+
+def documents(spec, count):
+    names = list(spec['definitions'])
+    return [f'# Page {index}\n\nSome text.\n\n:swg-def: {names[index % len(names)]}\n' for index in range(count)]
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        spec = generateSpec(definitions=100, depth=1, fanout=8, refDensity=0.02, enumSize=5)
+        file = os.path.join(directory, 'spec.json')
+        with open(file, 'w') as out:
+            json.dump(spec, out)
+
+        print(f'{"documents":>9} {"markdown s":>10} {"convertMany s":>13} {"speedup":>8}')
+        for count in [200, 1000, 3000]:
+            docs = documents(spec, count)
+            specCache.clear()
+            start = time.perf_counter()
+            expected = [markdown.markdown(text, extensions=[SwaggerExtension(file=file)]) for text in docs]
+            single = time.perf_counter() - start
+
+            specCache.clear()
+            start = time.perf_counter()
+            html = convertMany(docs, file=file)
+            batch = time.perf_counter() - start
+            assert html == expected
+            print(f'{count:>9} {single:>10.3f} {batch:>13.3f} {single / batch:>7.1f}x')
+    finally:
+        specCache.clear()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare the latency of a live preview converting a page in a new process
+with the latency of the render daemon, for an unchanged page and for a
+page where one directive changed.
+
+Run from the root of the repository:
+
+    python benchmarks/bench_daemon.py
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from specgen import generateSpec
+from swaggermarkdown.daemon import RenderServer, Renderer, renderRemote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONVERT = '''
+import sys, markdown
+sys.path.insert(0, {root!r})
+from swaggermarkdown.swaggermarkdown import SwaggerExtension
+markdown.Markdown(extensions=[SwaggerExtension(file={file!r})]).convert(sys.stdin.read())
+'''
+
+
+def page(spec, paths=40, definitions=40):
+    lines = [f':swg-path: {path}\n' for path in list(spec['paths'])[:paths]]
+    lines += [f':swg-def: {name}\n' for name in list(spec['definitions'])[:definitions]]
+    return '\n'.join(lines)
+
+
+def best(function, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    # the generated files are outside of the current directory
+    server = RenderServer(port=0, renderer=Renderer(root=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        print(f'{"definitions":>11} {"process ms":>11} {"daemon ms":>10} {"edited ms":>10}')
+        for definitions in (500, 2000):
+            spec = generateSpec(definitions=definitions, fanout=6, refDensity=0.05)
+            file = os.path.join(directory, f'swagger{definitions}.json')
+            with open(file, 'w') as out:
+                json.dump(spec, out)
+            text = page(spec)
+            script = CONVERT.format(root=ROOT, file=file)
+
+            process = best(lambda: subprocess.run([sys.executable, '-c', script], input=text,
+                check=True, text=True), repeat=3)
+            config = {'file': file}
+            renderRemote(text, server.url, config=config)
+            daemon = best(lambda: renderRemote(text, server.url, config=config))
+            # a writer typing in the configuration of one directive
+            edits = iter(range(1000))
+            directive = text.index(':swg-def:')
+            directive = text.index('\n', directive)
+            edited = best(lambda: renderRemote(
+                f'{text[:directive]}\n    properties: {{p{next(edits)}: {{hide: true}}}}{text[directive:]}',
+                server.url, config=config))
+            print(f'{definitions:>11} {process:>11.1f} {daemon:>10.1f} {edited:>10.1f}')
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compare the swagger file parsers on tests/pet_store.json and on a large
+synthetic swagger file.
+
+Run from the root of the repository:
+
+    python benchmarks/bench_loaders.py
+"""
+
+import os
+import sys
+import json
+import time
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from specgen import generateSpec
+from swaggermarkdown.loaders import LOADERS
+
+
+def measure(loader, raw, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader(raw)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    with open('tests/pet_store.json', 'rb') as f:
+        pet = json.loads(f.read())
+    documents = [('pet_store', pet, 20), ('synthetic', generateSpec(definitions=2000, fanout=6), 3)]
+
+    print(f'{"document":<12} {"loader":<10} {"size":>10} {"ms":>10}')
+    for name, data, repeat in documents:
+        jsonRaw = json.dumps(data).encode('utf-8')
+        yamlRaw = yaml.dump(data, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper)).encode('utf-8')
+        for loaderName, loader in LOADERS.items():
+            raw = yamlRaw if loaderName.startswith('yaml') else jsonRaw
+            elapsed = measure(loader, raw, repeat)
+            print(f'{name:<12} {loaderName:<10} {len(raw):>10} {elapsed * 1000:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
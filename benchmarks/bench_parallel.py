@@ -0,0 +1,73 @@
+"""
+Time SwaggerPreprocessor.run on a page of 1200 directives rendered by
+a growing number of threads or processes (renderWorkers).
+
+Run from the root of the repository:
+
+    python benchmarks/bench_parallel.py
+
+Worker processes parse the swagger file once, the first run is not timed.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import markdown
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from specgen import generateSpec
+from swaggermarkdown.swaggermarkdown import SwaggerExtension, renderPools
+from swaggermarkdown.spec import specCache
+
+
+def document(spec):
+    lines = [f':swg-path: {path}\n' for path in spec['paths']]
+    lines += [f':swg-def: {name}\n' for name in spec['definitions']]
+    return '\n'.join(lines).split('\n')
+
+
+def best(preprocessor, lines, repeat=3):
+    preprocessor.run(lines)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        preprocessor.run(lines)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        spec = generateSpec(definitions=800, depth=2, fanout=6, refDensity=0.05, paths=400)
+        file = os.path.join(directory, 'spec.json')
+        with open(file, 'w') as out:
+            json.dump(spec, out)
+        lines = document(spec)
+
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=file)])
+        serial = best(md.preprocessors['swaggerinclude'], lines)
+        print(f'{"executor":>8} {"workers":>7} {"seconds":>8} {"speedup":>8}')
+        print(f'{"serial":>8} {1:>7} {serial:>8.3f} {1:>7.1f}x')
+
+        counts = sorted({2, 4, os.cpu_count() or 1} - {1})
+        for executor in ('thread', 'process'):
+            for workers in counts:
+                md = markdown.Markdown(extensions=[SwaggerExtension(file=file,
+                    renderWorkers=workers, renderExecutor=executor, renderBatchSize=20)])
+                preprocessor = md.preprocessors['swaggerinclude']
+                seconds = best(preprocessor, lines)
+                renderPools.pop((executor, workers)).shutdown()
+                print(f'{executor:>8} {workers:>7} {seconds:>8.3f} {serial / seconds:>7.1f}x')
+    finally:
+        specCache.clear()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Time SwaggerPreprocessor.run on documents with a growing number of directives.
+
+Run from the root of the repository:
+
+    python benchmarks/bench_preprocessor.py
+
+The time per directive should stay flat while the document grows.
+"""
+
+import os
+import sys
+import time
+import markdown
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swaggermarkdown.swaggermarkdown import SwaggerExtension
+
+
+def document(count):
+    directives = [
+        ':swg-def: FirstDefinition\n    properties:\n      year:\n        hide: true',
+        ':swg-def: SecondDefinition',
+        ':swg-path: /my-project\n    verbs:\n      - post',
+        ':swg-path: /users/{userId}',
+    ]
+    lines = []
+    for index in range(count):
+        lines.append(f'## Section {index}')
+        lines.append('')
+        lines.append(directives[index % len(directives)])
+        lines.append('')
+    return '\n'.join(lines).split('\n')
+
+
+def main():
+    md = markdown.Markdown(extensions=[SwaggerExtension(file='tests/test_swagger.json')])
+    preprocessor = md.preprocessors['swaggerinclude']
+    # warm up the spec cache
+    preprocessor.run(document(4))
+
+    print(f'{"directives":>10} {"lines out":>10} {"seconds":>9} {"us/directive":>13}')
+    for count in [100, 1000, 10000]:
+        lines = document(count)
+        start = time.perf_counter()
+        out = preprocessor.run(lines)
+        elapsed = time.perf_counter() - start
+        print(f'{count:>10} {len(out):>10} {elapsed:>9.3f} {elapsed / count * 1e6:>13.1f}')
+
+
+if __name__ == '__main__':
+    main()
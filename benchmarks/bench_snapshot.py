@@ -0,0 +1,69 @@
+"""
+Compare the cold start of a process parsing a large synthetic swagger file
+with json.load and loading the snapshot written by a previous process.
+
+Each measure runs in a new Python process, as a CI job or a fresh
+`mkdocs build` would. Run from the root of the repository:
+
+    python benchmarks/bench_snapshot.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from specgen import generateSpec
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# prints the seconds spent loading the file and building its index
+COLD_START = '''
+import sys, time
+sys.path.insert(0, {root!r})
+from swaggermarkdown.spec import SpecCache
+from swaggermarkdown.snapshots import SnapshotCache
+cache = SpecCache(loader='json')
+if {snapshots!r}:
+    cache.snapshots = SnapshotCache({snapshots!r})
+start = time.perf_counter()
+cache.load({file!r})
+print(time.perf_counter() - start)
+'''
+
+
+def coldStart(file, snapshots='', repeat=5):
+    script = COLD_START.format(root=ROOT, file=file, snapshots=snapshots)
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', script], check=True, capture_output=True, text=True)
+        times.append(float(out.stdout))
+    return min(times)
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        print(f'{"definitions":>12} {"size":>10} {"json.load":>10} {"snapshot":>10} {"speedup":>8}')
+        for definitions in (500, 2000, 4000):
+            file = os.path.join(directory, f'swagger{definitions}.json')
+            with open(file, 'w') as out:
+                json.dump(generateSpec(definitions=definitions, fanout=6), out)
+            snapshots = os.path.join(directory, f'snapshots{definitions}')
+            # the first process writes the snapshot
+            coldStart(file, snapshots, repeat=1)
+            parsed = coldStart(file)
+            loaded = coldStart(file, snapshots)
+            print(f'{definitions:>12} {os.path.getsize(file):>10} {parsed * 1000:>8.1f}ms '
+                f'{loaded * 1000:>8.1f}ms {parsed / loaded:>7.1f}x')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
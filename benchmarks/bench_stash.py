@@ -0,0 +1,69 @@
+"""
+Compare markdown.convert with and without the useHtmlStash option on
+pages with large definition tables.
+
+Run from the root of the repository:
+
+    python benchmarks/bench_stash.py
+
+With useHtmlStash the block parser does not parse the rendered tables again.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import markdown
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from specgen import generateSpec
+from swaggermarkdown.swaggermarkdown import SwaggerExtension
+from swaggermarkdown.spec import specCache
+
+
+def document(spec):
+    lines = [f':swg-path: {path}\n' for path in spec['paths']]
+    lines += [f':swg-def: {name}\n' for name in spec['definitions']]
+    return '\n'.join(lines)
+
+
+def best(function, repeat=3):
+    function()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        print(f'{"definitions":>11} {"fanout":>6} {"html MB":>8} {"lines s":>8} {"stash s":>8} {"speedup":>8}')
+        for definitions, fanout in [(50, 10), (200, 20), (400, 30)]:
+            spec = generateSpec(definitions=definitions, depth=1, fanout=fanout, refDensity=0.02, enumSize=20)
+            file = os.path.join(directory, f'spec{definitions}-{fanout}.json')
+            with open(file, 'w') as out:
+                json.dump(spec, out)
+            text = document(spec)
+
+            def convert(useHtmlStash):
+                md = markdown.Markdown(extensions=[SwaggerExtension(file=file, useHtmlStash=useHtmlStash)])
+                return md.convert(text)
+
+            size = len(convert(False)) / 1e6
+            lines = best(lambda: convert(False))
+            stash = best(lambda: convert(True))
+            print(f'{definitions:>11} {fanout:>6} {size:>8.2f} {lines:>8.3f} {stash:>8.3f} {lines / stash:>7.1f}x')
+    finally:
+        specCache.clear()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare the peak memory of writing the whole reference of a swagger file
+with renderSpecTo and of building it as one string, for growing files.
+
+Run from the root of the repository:
+
+    python benchmarks/bench_stream.py
+
+The parsed file is loaded before measuring, the peak is what rendering adds:
+with renderSpecTo it is mostly the examples of the definitions shared by
+the operations, which grow with the file but not with the output.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from specgen import generateSpec
+from swaggermarkdown.cli import iterSpec, renderSpecTo
+from swaggermarkdown.spec import specCache
+
+
+class NullSink():
+    """A file-like object forgetting what is written, like a file on disk"""
+
+    def write(self, text):
+        return len(text)
+
+
+def peak(function, file):
+    specCache.clear()
+    specCache.load(os.path.abspath(file))
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = function(file)
+    elapsed = time.perf_counter() - start
+    _, peakSize = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, peakSize / 1e6, elapsed
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        print(f'{"definitions":>11} {"output MB":>10} {"string MB":>10} {"stream MB":>10} {"stream s":>9}')
+        for definitions in (100, 400, 1600):
+            spec = generateSpec(definitions=definitions, fanout=6, refDensity=0.05)
+            file = os.path.join(directory, f'swagger{definitions}.json')
+            with open(file, 'w') as out:
+                json.dump(spec, out)
+
+            size, stringPeak, _ = peak(lambda file: len(''.join(iterSpec(file))), file)
+            _, streamPeak, elapsed = peak(lambda file: renderSpecTo(NullSink(), file), file)
+            print(f'{definitions:>11} {size / 1e6:>10.1f} {stringPeak:>10.1f} {streamPeak:>10.1f} {elapsed:>9.2f}')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark suite on synthetic swagger files
+
+Run from the root of the repository:
+
+    python benchmarks/run.py                                 # print the results
+    python benchmarks/run.py --save benchmarks/baseline.json  # save a baseline
+    python benchmarks/run.py --compare benchmarks/baseline.json
+
+With --compare the command fails when a benchmark is slower, or uses more
+memory, than the baseline by more than --threshold (default: 20%).
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import markdown
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from specgen import generateSpec
+from swaggermarkdown.swaggermarkdown import SwaggerDefinition, SwaggerPath, SwaggerExtension
+from swaggermarkdown.spec import specCache
+
+# examples expand every $ref, with fanout * refDensity over 1 their size grows
+# exponentially with the length of the reference chains
+SCENARIOS = {
+    'small': dict(definitions=50, depth=2, fanout=4, refDensity=0.15),
+    'deep': dict(definitions=100, depth=5, fanout=3, refDensity=0.1),
+    'wide': dict(definitions=500, depth=1, fanout=12, refDensity=0.05, enumSize=50),
+}
+
+
+def document(spec):
+    lines = []
+    for path in spec['paths']:
+        lines.append(f':swg-path: {path}\n')
+    for name in spec['definitions']:
+        lines.append(f':swg-def: {name}\n')
+    return '\n'.join(lines)
+
+
+def definitionTables(file, spec):
+    for name in spec['definitions']:
+        handler = SwaggerDefinition(file=file)
+        handler.render(handler.load(f':swg-def: {name}'))
+
+
+def pathReprs(file, spec):
+    for path in spec['paths']:
+        handler = SwaggerPath(file=file)
+        handler.render(handler.load(f':swg-path: {path}'))
+
+
+def preprocessorRun(file, spec):
+    md = markdown.Markdown(extensions=[SwaggerExtension(file=file)])
+    md.preprocessors['swaggerinclude'].run(document(spec).split('\n'))
+
+
+def convert(file, spec):
+    markdown.Markdown(extensions=[SwaggerExtension(file=file)]).convert(document(spec))
+
+
+def coldConvert(file, spec):
+    specCache.clear()
+    convert(file, spec)
+
+
+BENCHMARKS = {
+    'definitionTable': definitionTables,
+    'pathRepr': pathReprs,
+    'SwaggerPreprocessor.run': preprocessorRun,
+    'markdown.convert': convert,
+    'markdown.convert cold': coldConvert,
+}
+
+
+def measure(function, file, spec, repeat):
+    # warm the spec cache, a cold benchmark clears it itself
+    function(file, spec)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(file, spec)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    function(file, spec)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': best, 'peakBytes': peak}
+
+
+def runSuite(scenarios, repeat):
+    results = {}
+    directory = tempfile.mkdtemp()
+    try:
+        for scenario, params in scenarios.items():
+            spec = generateSpec(**params)
+            file = os.path.join(directory, f'{scenario}.json')
+            with open(file, 'w') as out:
+                json.dump(spec, out)
+            for name, function in BENCHMARKS.items():
+                key = f'{scenario}/{name}'
+                results[key] = measure(function, file, spec, repeat)
+                print(f'{key:<36} {results[key]["seconds"] * 1000:>10.1f} ms '
+                      f'{results[key]["peakBytes"] / 1e6:>8.1f} MB peak', flush=True)
+    finally:
+        specCache.clear()
+        shutil.rmtree(directory)
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in ('seconds', 'peakBytes'):
+            before = baseline[key][metric]
+            if before and result[metric] > before * (1 + threshold):
+                regressions.append(f'{key} {metric}: {before:.4g} -> {result[metric]:.4g}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+        help='run only this scenario, can be repeated')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='compare the results with this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    scenarios = {name: SCENARIOS[name] for name in args.scenario or SCENARIOS}
+    results = runSuite(scenarios, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as out:
+            json.dump(results, out, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
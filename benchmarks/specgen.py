@@ -0,0 +1,113 @@
+"""
+Generate synthetic Swagger 2.0 files for benchmarks
+
+    python benchmarks/specgen.py --definitions 500 --depth 3 -o /tmp/spec.json
+"""
+
+import argparse
+import random
+import json
+
+VERBS = ['get', 'post', 'put', 'delete', 'patch']
+FORMATS = [
+    {'type': 'string'},
+    {'type': 'string', 'format': 'uuid'},
+    {'type': 'string', 'format': 'date-time'},
+    {'type': 'integer', 'format': 'int64'},
+    {'type': 'number'},
+    {'type': 'boolean'},
+]
+
+
+def generateSpec(definitions=100, depth=2, fanout=4, refDensity=0.3, enumSize=5,
+        paths=None, operationsPerPath=2, seed=0):
+    """
+    A Swagger 2.0 document with:
+
+    definitions: number of definitions
+    depth: nesting depth of inline objects in each definition
+    fanout: number of properties of each object
+    refDensity: probability for a property to be a $ref to another definition
+    enumSize: number of values of enum properties
+    paths: number of paths (default: half the number of definitions)
+    operationsPerPath: number of verbs of each path
+    """
+    rng = random.Random(seed)
+    names = [f'Definition{index}' for index in range(definitions)]
+    if paths is None:
+        paths = max(definitions // 2, 1)
+
+    def ref():
+        return {'$ref': f'#/definitions/{rng.choice(names)}'}
+
+    def schema(level):
+        properties = {}
+        for index in range(fanout):
+            name = f'field{index}'
+            kind = rng.random()
+            if names and kind < refDensity:
+                properties[name] = ref() if rng.random() < 0.5 else {'type': 'array', 'items': ref()}
+            elif level < depth and kind < refDensity + 0.2:
+                properties[name] = schema(level + 1)
+            elif enumSize and kind < refDensity + 0.3:
+                properties[name] = {'type': 'string', 'enum': [f'value{v}' for v in range(enumSize)]}
+            else:
+                properties[name] = dict(rng.choice(FORMATS), description=f'The {name} field')
+        return {
+            'type': 'object',
+            'required': list(properties)[:1],
+            'properties': properties,
+        }
+
+    spec = {
+        'swagger': '2.0',
+        'info': {'title': 'Synthetic', 'version': '1.0.0'},
+        'host': 'example.com',
+        'basePath': '/v1',
+        'schemes': ['https'],
+        'paths': {},
+        'definitions': {name: schema(1) for name in names},
+    }
+
+    for index in range(paths):
+        pathDef = {}
+        for verb in VERBS[:operationsPerPath]:
+            parameters = [{'name': 'id', 'in': 'path', 'required': True, 'type': 'integer', 'format': 'int64'}]
+            if names and verb in ('post', 'put', 'patch'):
+                parameters.append({'name': 'body', 'in': 'body', 'required': True, 'schema': ref()})
+            responses = {'404': {'description': 'Not found'}}
+            if names:
+                responses['200'] = {'description': 'Success', 'schema': ref()}
+            pathDef[verb] = {
+                'tags': [f'tag{index % 10}'],
+                'summary': f'{verb} resource {index}',
+                'produces': ['application/json'],
+                'parameters': parameters,
+                'responses': responses,
+            }
+        spec['paths'][f'/resource{index}/{{id}}'] = pathDef
+
+    return spec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('--definitions', type=int, default=100)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--ref-density', type=float, default=0.3)
+    parser.add_argument('--enum-size', type=int, default=5)
+    parser.add_argument('--paths', type=int, default=None)
+    parser.add_argument('--operations-per-path', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    spec = generateSpec(definitions=args.definitions, depth=args.depth, fanout=args.fanout,
+        refDensity=args.ref_density, enumSize=args.enum_size, paths=args.paths,
+        operationsPerPath=args.operations_per_path, seed=args.seed)
+    with open(args.output, 'w') as out:
+        json.dump(spec, out, indent=2)
+
+
+if __name__ == '__main__':
+    main()
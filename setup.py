@@ -1,11 +1,16 @@
 import setuptools
+import re
 
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
+# the version is kept in the package, importing it would need markdown
+with open("swaggermarkdown/__init__.py", "r", encoding="utf-8") as fh:
+    version = re.search(r"^__version__ = '([^']+)'", fh.read(), re.M).group(1)
+
 setuptools.setup(
     name="swagger-markdown",
-    version="0.9.16",
+    version=version,
     author="Batiste Bieler",
     author_email="batiste.bieler@gmail.com",
     description="A Python Markdown extension to include Swagger informations in your documentation",
@@ -17,6 +22,14 @@ setuptools.setup(
         "markdown",
         "pyyaml",
     ],
+    entry_points={
+        "console_scripts": [
+            "swagger-markdown=swaggermarkdown.cli:main",
+        ],
+        "mkdocs.plugins": [
+            "swaggermarkdown=swaggermarkdown.mkdocs_plugin:SwaggerMarkdownPlugin",
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: Apache Software License",
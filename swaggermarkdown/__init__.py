@@ -1 +1,4 @@
-from .swaggermarkdown import makeExtension
\ No newline at end of file
+__version__ = '0.9.16'
+
+from .swaggermarkdown import makeExtension
+from .batch import convertMany
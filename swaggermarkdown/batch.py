@@ -0,0 +1,46 @@
+"""
+Conversion of many documents with one configured markdown instance
+
+    from swaggermarkdown import convertMany
+    pages = convertMany(texts, file='swagger.json', useHtmlStash=True)
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from .swaggermarkdown import SwaggerExtension
+import markdown
+
+# the markdown instance of a worker process
+worker = None
+
+
+def createMarkdown(extensions, config):
+    return markdown.Markdown(extensions=list(extensions) + [SwaggerExtension(**config)])
+
+
+def startWorker(extensions, config):
+    global worker
+    worker = createMarkdown(extensions, config)
+
+
+def convertWorker(text):
+    return worker.reset().convert(text)
+
+
+def convertMany(docs, workers=0, chunkSize=16, extensions=(), **config):
+    """
+    Convert markdown documents and return their HTML in the same order.
+    One Markdown instance with SwaggerExtension(**config) converts every
+    document and is reset in between, so the parsed swagger files, the
+    compiled directive configurations and the example generators are
+    shared by all of them. With workers above 1 the documents are split in
+    chunks of chunkSize between processes with one instance each, the
+    configuration must then be picklable.
+    """
+    docs = list(docs)
+    if workers > 1 and len(docs) > chunkSize:
+        with ProcessPoolExecutor(max_workers=workers, initializer=startWorker,
+                initargs=(extensions, config)) as executor:
+            return list(executor.map(convertWorker, docs, chunksize=chunkSize))
+
+    md = createMarkdown(extensions, config)
+    return [md.reset().convert(text) for text in docs]
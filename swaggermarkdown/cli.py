@@ -0,0 +1,253 @@
+"""
+Command line rendering of a whole swagger file
+
+    swagger-markdown render swagger.json -o docs/api
+    swagger-markdown render swagger.json -o - > api.md
+    swagger-markdown serve
+    swagger-markdown client page.md -o page.html
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from .swaggermarkdown import SwaggerDefinition, SwaggerPath, iterText
+from .spec import specCache
+import argparse
+import json
+import sys
+import os
+import re
+
+
+def slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '-', text).strip('-') or 'root'
+
+
+def renderOperation(task):
+    file, definitionsUrl, path, verb = task
+    handler = SwaggerPath(file=file, definitionsUrl=definitionsUrl, config={'verbs': [verb]})
+    return handler.render(handler.loadPath(file, path))
+
+
+def renderDefinition(task):
+    file, name = task
+    handler = SwaggerDefinition(file=file)
+    definition = handler.loadDefinition(file, name)
+    # every definition is in the same file, links are always local
+    handler.definitionNames = handler.index.definitionNames
+    return handler.render(definition)
+
+
+def render(executor, function, tasks, chunkSize):
+    """
+    Render tasks in order, in this process if there is no executor. The
+    fragments are rendered while they are consumed.
+    """
+    if executor is None:
+        return map(function, tasks)
+    return executor.map(function, tasks, chunksize=chunkSize)
+
+
+def pages(index, split):
+    """
+    Group the operations in pages, by their first tag or one page per operation.
+    Pages and operations keep the order of the swagger file. Pages whose
+    names would be the same file get a numeric suffix.
+    """
+    groups = {}
+    for (path, verb), operation in index.operations.items():
+        if split == 'operation':
+            name = slug(f'{verb}-{path}')
+            title = f'{verb.upper()} {path}'
+        else:
+            tags = operation.get('tags') or ['default']
+            name = slug(tags[0])
+            title = tags[0]
+        groups.setdefault(title, (name, []))[1].append((path, verb))
+
+    out = {}
+    # definitions.md is written next to the pages, and some file systems ignore the case
+    used = {'definitions'}
+    for title, (base, ops) in groups.items():
+        name = base
+        number = 2
+        while name.lower() in used:
+            name = f'{base}-{number}'
+            number += 1
+        used.add(name.lower())
+        out[name] = (title, ops)
+    return out
+
+
+def renderSpec(file, outdir, split='tag', workers=None, chunkSize=8, definitionsUrl='definitions.md'):
+    """
+    Write one markdown file per tag or per operation and a definitions.md
+    file in outdir. Return the list of written files.
+    """
+    file = os.path.abspath(file)
+    index = specCache.load(file).index
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    grouped = pages(index, split)
+    operations = [(file, definitionsUrl, path, verb)
+        for _, (_, ops) in grouped.items() for path, verb in ops]
+    definitions = [(file, name) for name in index.definitions]
+
+    os.makedirs(outdir, exist_ok=True)
+    written = []
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        fragments = render(executor, renderOperation, operations, chunkSize)
+        for name, (title, ops) in grouped.items():
+            filename = os.path.join(outdir, f'{name}.md')
+            with open(filename, 'w', encoding='utf-8') as out:
+                out.write(f'# {title}\n\n')
+                for path, verb in ops:
+                    if split != 'operation':
+                        out.write(f'## {verb.upper()} {path}\n\n')
+                    out.write(next(fragments))
+                    out.write('\n\n')
+            written.append(filename)
+
+        if definitions:
+            definitionFragments = render(executor, renderDefinition, definitions, chunkSize)
+            filename = os.path.join(outdir, 'definitions.md')
+            with open(filename, 'w', encoding='utf-8') as out:
+                out.write('# Definitions\n\n')
+                for (_, name), fragment in zip(definitions, definitionFragments):
+                    out.write(f'## {name}\n\n{fragment}\n\n')
+            written.append(filename)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return written
+
+
+def iterSpec(file, split='tag'):
+    """
+    The whole reference of a swagger file as one markdown document, the
+    pages of renderSpec followed by the definitions. The text is yielded
+    piece by piece while each operation and definition is rendered, so
+    only one of them is in memory at a time.
+    """
+    file = os.path.abspath(file)
+    index = specCache.load(file).index
+    # every definition is in the document, links are always local
+    paths = SwaggerPath(file=file, definitionNames=index.definitionNames)
+    for title, ops in pages(index, split).values():
+        yield f'# {title}\n\n'
+        for path, verb in ops:
+            if split != 'operation':
+                yield f'## {verb.upper()} {path}\n\n'
+            pathDef = paths.loadPath(file, path)
+            yield from iterText(paths.iterPathChunks(pathDef, [verb]))
+            yield '\n\n'
+
+    if index.definitions:
+        yield '# Definitions\n\n'
+        definitions = SwaggerDefinition(file=file, definitionNames=index.definitionNames)
+        for name in index.definitions:
+            definition = definitions.loadDefinition(file, name)
+            yield f'## {name}\n\n'
+            yield from iterText(definitions.iterChunks(definition))
+            yield '\n\n'
+
+
+def renderSpecTo(stream, file, split='tag'):
+    """Write the document of iterSpec to a file-like object, return the number of characters"""
+    written = 0
+    for text in iterSpec(file, split):
+        stream.write(text)
+        written += len(text)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='swagger-markdown')
+    commands = parser.add_subparsers(dest='command')
+
+    renderCommand = commands.add_parser('render', help='render every path and definition of a swagger file')
+    renderCommand.add_argument('file', help='the swagger file')
+    renderCommand.add_argument('-o', '--output', default='.',
+        help='the output directory, - to write a single document to the standard output')
+    renderCommand.add_argument('--split', choices=['tag', 'operation'], default='tag',
+        help='one file per tag (the first tag of each operation) or per operation')
+    renderCommand.add_argument('-j', '--workers', type=int, default=None,
+        help='number of worker processes, 1 renders in this process (default: number of CPUs)')
+    renderCommand.add_argument('--chunk-size', type=int, default=8,
+        help='number of operations or definitions sent to a worker at once')
+    renderCommand.add_argument('--definitions-url', default='definitions.md',
+        help='URL added in front of definition links in the operation files')
+
+    serveCommand = commands.add_parser('serve', help='render documents sent by the client, keeping the swagger files in memory')
+    serveCommand.add_argument('--host', default='127.0.0.1', help='the address to listen on')
+    serveCommand.add_argument('--port', type=int, default=8765, help='the port to listen on')
+    serveCommand.add_argument('--interval', type=float, default=0.5,
+        help='seconds between two checks of the modification time of the swagger files')
+    serveCommand.add_argument('--root', default=None,
+        help='only the swagger files in this directory can be rendered (default: the current directory)')
+    serveCommand.add_argument('--allow-extension', action='append', default=[],
+        help='another markdown extension clients can use, can be repeated')
+
+    clientCommand = commands.add_parser('client', help='render a markdown file with a running daemon')
+    clientCommand.add_argument('file', help='the markdown file, - for the standard input')
+    clientCommand.add_argument('-o', '--output', default='-', help='the HTML file, - for the standard output')
+    clientCommand.add_argument('--url', default='http://127.0.0.1:8765', help='the URL of the daemon')
+    clientCommand.add_argument('--config', default='{}', help='the configuration of the extension as JSON')
+    clientCommand.add_argument('-x', '--extension', action='append', default=[],
+        help='another markdown extension, can be repeated')
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 1
+    if args.command == 'render' and args.output == '-':
+        renderSpecTo(sys.stdout, args.file, split=args.split)
+    elif args.command == 'render':
+        written = renderSpec(args.file, args.output, split=args.split, workers=args.workers,
+            chunkSize=args.chunk_size, definitionsUrl=args.definitions_url)
+        for filename in written:
+            print(filename)
+    if args.command == 'serve':
+        return serve(args.host, args.port, args.interval, args.root, args.allow_extension)
+    if args.command == 'client':
+        return client(args)
+    return 0
+
+
+def serve(host, port, interval, root=None, extensions=()):
+    from .daemon import RenderServer, Renderer, CLIENT_EXTENSIONS
+    renderer = Renderer(root=root, extensions=CLIENT_EXTENSIONS | set(extensions))
+    server = RenderServer(host, port, renderer=renderer, interval=interval)
+    print(f'swagger-markdown daemon listening on {server.url}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def client(args):
+    from .daemon import renderRemote, DaemonError
+    if args.file == '-':
+        text = sys.stdin.read()
+    else:
+        with open(args.file, encoding='utf-8') as source:
+            text = source.read()
+    try:
+        html = renderRemote(text, args.url, extensions=args.extension, config=json.loads(args.config))
+    except DaemonError as error:
+        print(f'swagger-markdown: {error}', file=sys.stderr)
+        return 1
+    if args.output == '-':
+        sys.stdout.write(html)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            out.write(html)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
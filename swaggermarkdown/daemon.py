@@ -0,0 +1,243 @@
+"""
+Render daemon for live previews
+
+    swagger-markdown serve --port 8765
+    swagger-markdown client page.md > page.html
+
+The daemon keeps the parsed swagger files and the rendered directives in
+memory, so a preview only pays for the directives that changed.
+
+Any local program or web page can send requests to the daemon. It only
+reads the swagger files in its root directory, and clients can only use
+the extensions and the configuration keys that do not touch other files.
+"""
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections import OrderedDict
+from .swaggermarkdown import SwaggerExtension
+from .fragments import MemoryFragmentCache
+from .spec import specCache as defaultSpecCache, SpecLoadError, LOAD_ERRORS
+import urllib.request
+import urllib.error
+import threading
+import markdown
+import logging
+import json
+import time
+import os
+
+log = logging.getLogger('swaggermarkdown')
+
+DEFAULT_URL = 'http://127.0.0.1:8765'
+
+# the extensions of python-markdown a client can use
+CLIENT_EXTENSIONS = frozenset(['abbr', 'admonition', 'attr_list', 'codehilite', 'def_list', 'extra',
+    'fenced_code', 'footnotes', 'legacy_attrs', 'legacy_em', 'md_in_html', 'meta', 'nl2br',
+    'sane_lists', 'smarty', 'tables', 'toc', 'wikilinks'])
+
+# the configuration keys a client can set, the others write files or start workers
+CLIENT_CONFIG = frozenset(['file', 'definitionsUrlRoot', 'exampleSeed', 'loader', 'collectStats',
+    'useHtmlStash', 'maxDepth', 'maxRows', 'maxExampleNodes', 'maxEnumValues', 'outputProfile',
+    'exampleIndent', 'exampleSeparators'])
+
+
+class DaemonError(Exception):
+    """The daemon could not render a document"""
+
+
+class SpecWatcher(threading.Thread):
+    """
+    Poll the modification time of the swagger files in a SpecCache and parse
+    again the ones that changed, before a preview needs them.
+    """
+
+    def __init__(self, specCache, interval=0.5):
+        super(SpecWatcher, self).__init__(name='swaggermarkdown-watcher', daemon=True)
+        self.specCache = specCache
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def poll(self):
+        """Parse again the modified files, return their paths"""
+        changed = self.specCache.changed()
+        for path in changed:
+            try:
+                self.specCache.load(path)
+            except LOAD_ERRORS as error:
+                # reported by the next render using the file
+                log.warning(f'unable to load {path}: {error}')
+        return changed
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class Renderer():
+    """
+    Convert documents with SwaggerExtension, sharing the spec cache and an
+    in memory fragment cache between every conversion. The markdown
+    instances are reused for the same extensions and configuration, and the
+    HTML of the last maxPages documents is kept until their swagger
+    content changes. Only the swagger files in root are read.
+    """
+
+    # the same HTML as the default configuration, without parsing the tables again
+    defaults = {'useHtmlStash': True}
+
+    def __init__(self, fragmentCacheSize=64 * 1024 * 1024, maxPages=32, root=None,
+            extensions=CLIENT_EXTENSIONS):
+        self.root = os.path.realpath(os.getcwd() if root is None else root)
+        # the extensions a client can use
+        self.extensions = frozenset(extensions)
+        # the cache used by SwaggerExtension
+        self.specCache = defaultSpecCache
+        self.fragmentCache = MemoryFragmentCache(fragmentCacheSize)
+        # key of the extensions and configuration -> idle markdown instances
+        self.instances = {}
+        # (key, text) -> (html, PageDependencies)
+        self.pages = OrderedDict()
+        self.maxPages = maxPages
+        self.renders = 0
+        self.lock = threading.Lock()
+
+    def markdown(self, extensions, config):
+        key = json.dumps([extensions, config], sort_keys=True)
+        with self.lock:
+            idle = self.instances.setdefault(key, [])
+            if idle:
+                return key, idle.pop()
+        # a markdown instance converts one document at a time
+        extension = SwaggerExtension(fragmentCache=self.fragmentCache, specRoot=self.root,
+            **dict(self.defaults, **config))
+        return key, markdown.Markdown(extensions=list(extensions) + [extension])
+
+    def render(self, text, extensions=(), config={}):
+        key, md = self.markdown(extensions, config)
+        try:
+            with self.lock:
+                self.renders += 1
+                page = self.pages.get((key, text))
+            if page is not None and not page[1].changed(md.preprocessors['swaggerinclude'].specCache):
+                return page[0]
+            html = md.reset().convert(text)
+            with self.lock:
+                self.pages[(key, text)] = (html, md.swaggerDependencies)
+                self.pages.move_to_end((key, text))
+                while len(self.pages) > self.maxPages:
+                    self.pages.popitem(last=False)
+        finally:
+            with self.lock:
+                self.instances[key].append(md)
+        return html
+
+    def check(self, extensions, config):
+        """Raise ValueError if a client uses an extension or a configuration key it cannot use"""
+        if not isinstance(extensions, list) or not isinstance(config, dict):
+            raise ValueError('extensions must be a list and config an object')
+        refused = [str(name) for name in extensions if name not in self.extensions]
+        if refused:
+            raise ValueError(f'extensions not allowed: {", ".join(refused)}')
+        refused = sorted(key for key in config if key not in CLIENT_CONFIG)
+        if refused:
+            raise ValueError(f'configuration not allowed: {", ".join(refused)}')
+
+    def status(self):
+        with self.lock:
+            renders = self.renders
+        return {
+            'renders': renders,
+            'pages': len(self.pages),
+            'specs': len(self.specCache.entries),
+            'fragments': len(self.fragmentCache.fragments),
+            'fragmentsSize': self.fragmentCache.size,
+        }
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    """
+    POST /render with {"text": markdown, "extensions": [...], "config": {...}}
+    returns {"html": html, "milliseconds": time}, GET /status the counters.
+    """
+
+    server_version = 'swagger-markdown'
+
+    def reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/status':
+            return self.reply(404, {'error': f'unknown path {self.path}'})
+        self.reply(200, self.server.renderer.status())
+
+    def do_POST(self):
+        if self.path != '/render':
+            return self.reply(404, {'error': f'unknown path {self.path}'})
+        # a web page cannot send JSON to another origin without the consent of the daemon
+        if self.headers.get_content_type() != 'application/json':
+            return self.reply(415, {'error': 'the request must be application/json'})
+        start = time.perf_counter()
+        renderer = self.server.renderer
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            extensions = request.get('extensions') or []
+            config = request.get('config') or {}
+            renderer.check(extensions, config)
+            html = renderer.render(request.get('text', ''), extensions, config)
+        except (SpecLoadError, ValueError, KeyError, TypeError) as error:
+            return self.reply(400, {'error': f'{type(error).__name__}: {error}'})
+        except Exception as error:
+            # the daemon keeps running for the next previews
+            log.exception('unable to render the document')
+            return self.reply(500, {'error': f'{type(error).__name__}: {error}'})
+        self.reply(200, {'html': html, 'milliseconds': (time.perf_counter() - start) * 1000})
+
+    def log_message(self, format, *args):
+        log.debug(format % args)
+
+
+class RenderServer(ThreadingHTTPServer):
+    """A ThreadingHTTPServer rendering with a Renderer and watching its swagger files"""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=8765, renderer=None, interval=0.5):
+        super(RenderServer, self).__init__((host, port), RenderHandler)
+        self.renderer = Renderer() if renderer is None else renderer
+        self.watcher = SpecWatcher(self.renderer.specCache, interval)
+        self.watcher.start()
+
+    def server_close(self):
+        self.watcher.stop()
+        super(RenderServer, self).server_close()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+def renderRemote(text, url=DEFAULT_URL, extensions=(), config={}, timeout=30):
+    """Render a markdown document with a running daemon and return the HTML"""
+    payload = json.dumps({'text': text, 'extensions': list(extensions), 'config': config}).encode('utf-8')
+    request = urllib.request.Request(f'{url}/render', data=payload,
+        headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())['html']
+    except urllib.error.HTTPError as error:
+        try:
+            message = json.loads(error.read())['error']
+        except (ValueError, KeyError):
+            message = str(error)
+        raise DaemonError(message) from error
+    except urllib.error.URLError as error:
+        raise DaemonError(f'no daemon at {url}: {error.reason}') from error
@@ -0,0 +1,62 @@
+"""
+Swagger files and nodes used to render a page
+"""
+
+import threading
+
+# called with the PageDependencies of every converted document
+dependencyListeners = []
+
+
+class PageDependencies():
+    """
+    For each swagger file, the definitions, paths and global fields used
+    by a page, with a structural hash of each of them. A page needs to be
+    rendered again only if one of those hashes changes.
+    """
+
+    def __init__(self, specs=None):
+        # path of the swagger file -> {"kind:name": hash}
+        self.specs = specs or {}
+        self.lock = threading.Lock()
+
+    def add(self, spec, nodes):
+        hashes = {f'{kind}:{name}': spec.index.nodeHash(kind, name) for kind, name in nodes}
+        with self.lock:
+            self.specs.setdefault(spec.path, {}).update(hashes)
+
+    def update(self, other):
+        """Add the dependencies of other, for example found by another process"""
+        with self.lock:
+            for path, hashes in other.specs.items():
+                self.specs.setdefault(path, {}).update(hashes)
+
+    def changed(self, specCache):
+        for path, hashes in self.specs.items():
+            nodes = [key.split(':', 1) for key in hashes]
+            selection = {}
+            for kind, name in nodes:
+                selection.setdefault(kind, []).append(name)
+            try:
+                if set(selection) <= {'definition', 'path', 'global'}:
+                    # a large file is only parsed for the nodes the page used
+                    spec = specCache.load(path, definitions=selection.get('definition'), paths=selection.get('path'))
+                else:
+                    spec = specCache.load(path)
+                index = spec.index
+            except (OSError, ValueError):
+                return True
+            for (kind, name), value in zip(nodes, hashes.values()):
+                if index.nodeHash(kind, name) != value:
+                    return True
+        return False
+
+    def toDict(self):
+        return self.specs
+
+    @classmethod
+    def fromDict(cls, specs):
+        return cls(specs)
+
+    def __bool__(self):
+        return bool(self.specs)
@@ -0,0 +1,238 @@
+"""
+Example values generated from swagger schemas
+"""
+
+from .stats import nullStats
+from .limits import DEFAULT_LIMITS
+from .index import LOCAL
+import threading
+import datetime
+import random
+import uuid
+
+
+class ExampleEngine():
+    """
+    Build examples for the schemas of one swagger file.
+
+    The example of each definition is built once and shared by every
+    directive using the file. A definition referencing itself, directly
+    or not, is replaced by a placeholder the second time it is met.
+
+    A $ref to another file is followed with a RefResolver, the examples
+    using another file are only reused while that file is unchanged.
+
+    Schemas are walked with an explicit stack, examples deeper than
+    maxDepth or larger than maxExampleNodes are truncated. Only complete
+    examples are shared, so the shared examples do not depend on the limits.
+    """
+
+    def __init__(self, index, seed='', path=None):
+        self.index = index
+        self.seed = seed
+        # the swagger file of the index, relative $ref are resolved from it
+        self.path = path
+        # key -> (example, {path: digest} of the other files used, nodes, depth)
+        self.memo = {}
+        # definitions being expanded and definitions cut because of a cycle
+        self.building = set()
+        self.cut = set()
+        # definitions being expanded which are truncated by a limit
+        self.truncated = set()
+        # key being expanded -> other files used by it
+        self.external = {}
+        self.lock = threading.RLock()
+
+    def example(self, content, location='', stats=nullStats, resolver=None, base=None, limits=DEFAULT_LIMITS):
+        """
+        Build an example from a schema, location is where the schema
+        is found in the swagger file and makes the generated values stable.
+        base is the file containing the schema when it is not the file
+        of the engine.
+        """
+        root = [None]
+        nodes = 0
+        # ('build', schema, location, base, container, index, depth) puts the example
+        # of the schema in container[index], ('end', key, container, index) shares it
+        stack = [('build', content, location, base, root, 0, 0)]
+        with self.lock:
+            try:
+                while stack:
+                    frame = stack.pop()
+                    if frame[0] == 'end':
+                        self.finish(*frame[1:])
+                        continue
+                    _, content, location, base, container, index, depth = frame
+                    if content is None:
+                        continue
+                    if limits.maxExampleNodes and nodes >= limits.maxExampleNodes:
+                        container[index] = limits.marker('maxExampleNodes')
+                        self.truncated |= self.building
+                        nodes += 1
+                        continue
+                    if limits.maxDepth and depth > limits.maxDepth:
+                        container[index] = limits.marker('maxDepth')
+                        self.truncated |= self.building
+                        nodes += 1
+                        continue
+
+                    schema = content.get('schema', {})
+                    ctype = content.get('type') or schema.get('type')
+                    ref = content.get('$ref') or schema.get('$ref')
+
+                    if ctype == 'array':
+                        nodes += 1
+                        items = content.get('items') or schema.get('items')
+                        container[index] = [None]
+                        stack.append(('build', items, f'{location}/items', base, container[index], 0, depth + 1))
+                    elif ctype == 'object':
+                        nodes += 1
+                        properties = content.get('properties', {})
+                        c = container[index] = dict.fromkeys(properties)
+                        # the first property is expanded first
+                        for name, ct in reversed(list(properties.items())):
+                            stack.append(('build', ct, f'{location}/properties/{name}', base, c, name, depth + 1))
+                    elif ref:
+                        nodes += self.reference(ref, stats, resolver, base, limits, stack, container, index, depth, nodes)
+                    else:
+                        nodes += 1
+                        container[index] = self.value(content, location)
+            finally:
+                # a walk stopped by an error leaves definitions half expanded,
+                # the next walks must not see them
+                self.building.clear()
+                self.cut.clear()
+                self.truncated.clear()
+                self.external.clear()
+        return root[0]
+
+    def definition(self, ref, stats=nullStats, resolver=None, base=None, limits=DEFAULT_LIMITS):
+        """The example of a referenced definition"""
+        return self.example({'$ref': ref}, ref, stats, resolver, base, limits)
+
+    def reference(self, ref, stats, resolver, base, limits, stack, container, index, depth, nodes):
+        """
+        Put the example of a $ref in container[index], from the shared examples
+        or by adding its schema to the stack. Return the number of nodes added.
+        """
+        stats.count('refResolutions')
+        defName = self.index.refName(ref)
+        if base is None and ref.startswith('#'):
+            definition = self.index.resolve(ref)
+            # another section of the file can use the name of a definition
+            key = defName if ref.startswith(LOCAL) else ref
+        elif resolver is not None and self.path is not None:
+            spec, definition = resolver.resolve(base or self.path, ref)
+            base = spec.path
+            key = (spec.path, ref.partition('#')[2])
+            self.useFiles({spec.path: spec.digest})
+        else:
+            # another file cannot be read without a resolver, the
+            # definitions being expanded are incomplete
+            self.cut |= self.building
+            return 0
+        if definition is None:
+            return 0
+
+        if key in self.memo:
+            value, files, size, height = self.memo[key]
+            fits = ((not limits.maxExampleNodes or nodes + size <= limits.maxExampleNodes)
+                and (not limits.maxDepth or depth + height <= limits.maxDepth))
+            if fits and (resolver is None or all(resolver.current(p, d) for p, d in files.items())):
+                stats.count('exampleCacheHits')
+                self.useFiles(files)
+                container[index] = value
+                return size
+        if key in self.building:
+            self.cut.add(key)
+            container[index] = f'<{defName}>'
+            return 1
+
+        self.building.add(key)
+        stack.append(('end', key, container, index))
+        stack.append(('build', definition, ref, base, container, index, depth))
+        return 0
+
+    def finish(self, key, container, index):
+        """The expansion of a definition is done, share it if it is complete"""
+        self.building.discard(key)
+        files = self.external.pop(key, {})
+        # an example cut short because of a definition still being expanded
+        # depends on where the expansion started, it cannot be shared
+        if not self.cut & self.building and key not in self.truncated:
+            self.memo[key] = (container[index], files) + measure(container[index])
+        self.truncated.discard(key)
+        if not self.building:
+            self.cut.clear()
+
+    def useFiles(self, files):
+        """Record the other files used by the definitions being expanded"""
+        if files:
+            for key in self.building:
+                self.external.setdefault(key, {}).update(files)
+
+    def value(self, content, location=''):
+        """
+        An example value for a schema. Values are always the same for a given
+        location, unless a seed is configured, then they are drawn from
+        a random generator seeded with the seed and the location.
+        """
+        schema = content.get('schema')
+        if schema:
+            content = schema
+        ctype = content.get('type')
+        format = content.get('format')
+        example = content.get('example')
+        if example:
+            return example
+        enum = content.get('enum')
+        if enum:
+            return enum[0]
+
+        rng = None
+        if self.seed:
+            rng = random.Random(f'{self.seed}:{location}')
+
+        if ctype == 'integer' or ctype == 'number':
+            if rng:
+                return rng.randint(1, 1000)
+            return 123
+        elif ctype == 'string':
+            if format == 'date':
+                if rng:
+                    return (datetime.date(2000, 1, 1) + datetime.timedelta(days=rng.randrange(10000))).isoformat()
+                return '2019-07-21'
+            if format == 'date-time':
+                if rng:
+                    value = datetime.datetime(2000, 1, 1) + datetime.timedelta(seconds=rng.randrange(10000 * 86400))
+                    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+                return '2017-07-21T17:32:28Z'
+            if format == 'password':
+                return '*****'
+            if format == 'email':
+                return 'example@example.com'
+            if format == 'uuid':
+                if rng:
+                    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+                return str(uuid.uuid5(uuid.NAMESPACE_URL, location))
+            return 'lorem ipsum'
+        elif ctype == 'boolean':
+            return True
+
+        return ctype
+
+
+def measure(value):
+    """The number of nodes and the depth of an example"""
+    nodes = 0
+    height = 0
+    stack = [(value, 0)]
+    while stack:
+        value, depth = stack.pop()
+        nodes += 1
+        height = max(height, depth)
+        if isinstance(value, dict):
+            stack.extend((v, depth + 1) for v in value.values())
+        elif isinstance(value, list):
+            stack.extend((v, depth + 1) for v in value)
+    return nodes, height
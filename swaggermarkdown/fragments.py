@@ -0,0 +1,139 @@
+"""
+On disk cache of rendered directives
+"""
+
+from . import __version__
+from collections import OrderedDict
+import threading
+import hashlib
+import json
+import os
+
+
+class FragmentCache():
+    """
+    Rendered directives stored as files in a directory so they survive
+    between builds. When the directory grows over maxSize bytes the least
+    recently used fragments are removed.
+    """
+
+    suffix = '.fragment'
+
+    def __init__(self, directory, maxSize=64 * 1024 * 1024):
+        self.directory = directory
+        self.maxSize = maxSize
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(size for _, _, size in self.files())
+
+    def key(self, *parts):
+        """
+        A key from any JSON serialisable values. The version of the
+        extension is always part of the key as the output may change with it.
+        """
+        payload = json.dumps([__version__, parts], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def filename(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def files(self):
+        out = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                out.append((entry.path, stat.st_mtime, stat.st_size))
+        return out
+
+    def get(self, key):
+        filename = self.filename(key)
+        try:
+            with open(filename, encoding='utf-8') as fragment:
+                content = fragment.read()
+            # the modification time is used to find the least recently used fragments
+            os.utime(filename)
+        except FileNotFoundError:
+            return None
+        return content
+
+    def set(self, key, fragment):
+        filename = self.filename(key)
+        temporary = f'{filename}.{os.getpid()}.{threading.get_ident()}'
+        with open(temporary, 'w', encoding='utf-8') as out:
+            out.write(fragment)
+        size = os.path.getsize(temporary)
+        os.replace(temporary, filename)
+        with self.lock:
+            self.size += size
+            if self.size > self.maxSize:
+                self.evict()
+
+    def evict(self):
+        files = sorted(self.files(), key=lambda f: f[1])
+        self.size = sum(size for _, _, size in files)
+        for path, _, size in files:
+            if self.size <= self.maxSize:
+                break
+            self.remove(path)
+            self.size -= size
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def invalidate(self, key):
+        self.remove(self.filename(key))
+
+    def clear(self):
+        with self.lock:
+            for path, _, _ in self.files():
+                self.remove(path)
+            self.size = 0
+
+
+class MemoryFragmentCache(FragmentCache):
+    """
+    Rendered directives kept in memory by a long running process, like the
+    render daemon. When the fragments exceed maxSize characters the least
+    recently used are removed.
+    """
+
+    # not shared with worker processes
+    directory = None
+
+    def __init__(self, maxSize=64 * 1024 * 1024):
+        self.maxSize = maxSize
+        self.lock = threading.Lock()
+        self.fragments = OrderedDict()
+        self.size = 0
+
+    def get(self, key):
+        with self.lock:
+            fragment = self.fragments.get(key)
+            if fragment is not None:
+                self.fragments.move_to_end(key)
+            return fragment
+
+    def set(self, key, fragment):
+        with self.lock:
+            self.size += len(fragment) - len(self.fragments.pop(key, ''))
+            self.fragments[key] = fragment
+            while self.size > self.maxSize and self.fragments:
+                _, removed = self.fragments.popitem(last=False)
+                self.size -= len(removed)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.size -= len(self.fragments.pop(key, ''))
+
+    def clear(self):
+        with self.lock:
+            self.fragments.clear()
+            self.size = 0
@@ -0,0 +1,223 @@
+"""
+Lookup tables compiled once for each parsed swagger file
+"""
+
+from urllib.parse import unquote
+from fnmatch import fnmatchcase
+import hashlib
+import json
+
+LOCAL = '#/definitions/'
+VERBS = ['get', 'put', 'post', 'delete', 'options', 'head', 'patch']
+
+
+def walkRefs(obj):
+    """Yield every $ref found in a swagger object"""
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get('$ref')
+            if isinstance(ref, str):
+                yield ref
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+
+
+def isSelection(name):
+    """True for the names of directives selecting several paths or definitions"""
+    return '*' in name or name.startswith('tag:')
+
+
+def resolvePointer(data, pointer):
+    """The node at a JSON pointer such as /definitions/Pet, or None"""
+    node = data
+    for part in pointer.split('/')[1:]:
+        part = unquote(part).replace('~1', '/').replace('~0', '~')
+        if isinstance(node, dict):
+            node = node.get(part)
+        elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        else:
+            return None
+    return node
+
+
+class SpecIndex():
+    """
+    The definitions, operations and references of a swagger file.
+
+    Every $ref is parsed once when the index is compiled so rendering only
+    needs dictionary and set lookups.
+    """
+
+    # the fields filled by compile, saved in snapshots
+    compiledFields = ('operations', 'refNames', 'definitionRefs', 'pathRefs', 'usedBy', 'pathTrie', 'tags')
+
+    def __init__(self, data, state=None):
+        self.data = data
+        self.definitions = data.get('definitions') or {}
+        self.definitionNames = set(self.definitions)
+        self.paths = data.get('paths') or {}
+        # (path, verb) -> operation
+        self.operations = {}
+        # $ref -> name of the referenced definition
+        self.refNames = {}
+        # definition name -> definitions directly referenced by it
+        self.definitionRefs = {}
+        # path -> definitions directly referenced by the path
+        self.pathRefs = {}
+        # definition name -> ('definition', name) and ('operation', path, verb) using it
+        self.usedBy = {}
+        # (kind, name) -> structural hash of the node
+        self.hashes = {}
+        # local $ref other than #/definitions/ -> node
+        self.pointers = {}
+        # path segment -> nested segments, a complete path is stored under None
+        self.pathTrie = {}
+        # tag -> [(path, verb)] in the order of the file
+        self.tags = {}
+        if state is None:
+            self.compile()
+        else:
+            self.__dict__.update(state)
+
+    def compile(self):
+        for name, definition in self.definitions.items():
+            self.definitionRefs[name] = self.references(definition, ('definition', name))
+
+        for path, pathDef in self.paths.items():
+            node = self.pathTrie
+            for segment in path.strip('/').split('/'):
+                node = node.setdefault(segment, {})
+            node[None] = path
+
+            refs = set()
+            for verb, operation in pathDef.items():
+                if verb in VERBS:
+                    self.operations[(path, verb)] = operation
+                    refs |= self.references(operation, ('operation', path, verb))
+                    for tag in operation.get('tags') or ():
+                        self.tags.setdefault(tag, []).append((path, verb))
+                else:
+                    refs |= self.references(operation)
+            self.pathRefs[path] = refs
+
+    def state(self):
+        """The compiled fields, to create the same index again with SpecIndex(data, state)"""
+        return {name: getattr(self, name) for name in self.compiledFields}
+
+    def references(self, obj, user=None):
+        names = set()
+        for ref in walkRefs(obj):
+            name = self.refName(ref)
+            names.add(name)
+            if user is not None:
+                self.usedBy.setdefault(name, set()).add(user)
+        return names
+
+    def refName(self, ref):
+        name = self.refNames.get(ref)
+        if name is None:
+            name = ref.split('/')[-1]
+            self.refNames[ref] = name
+        return name
+
+    def resolve(self, ref):
+        """The node of a local $ref, or None"""
+        if ref.startswith(LOCAL):
+            return self.definitions.get(ref[len(LOCAL):])
+        if not ref.startswith('#'):
+            return None
+        if ref not in self.pointers:
+            self.pointers[ref] = resolvePointer(self.data, ref[1:])
+        return self.pointers[ref]
+
+    def refAnchor(self, ref):
+        """The anchor of the table of a referenced definition"""
+        _, _, pointer = ref.partition('#')
+        return f'#{pointer}' if pointer else f'{LOCAL}{self.refName(ref)}'
+
+    def matchPaths(self, pattern):
+        """
+        The paths matching a pattern, in the order of the file. A * matches
+        one segment, or a part of it like pet*, and ** any number of segments.
+        """
+        parts = pattern.strip('/').split('/')
+        found = set()
+        seen = set()
+        stack = [(self.pathTrie, 0)]
+        while stack:
+            node, position = stack.pop()
+            if (id(node), position) in seen:
+                continue
+            seen.add((id(node), position))
+            if position == len(parts):
+                if None in node:
+                    found.add(node[None])
+                continue
+            part = parts[position]
+            children = [(key, child) for key, child in node.items() if key is not None]
+            if part == '**':
+                stack.append((node, position + 1))
+                stack.extend((child, position) for _, child in children)
+            elif '*' in part:
+                stack.extend((child, position + 1) for key, child in children if fnmatchcase(key, part))
+            elif part in node:
+                stack.append((node[part], position + 1))
+        return [path for path in self.paths if path in found]
+
+    def selectPaths(self, selector):
+        """
+        [(path, verbs)] selected by tag:name or by a path pattern, verbs
+        is None when every operation of the path is selected
+        """
+        if selector.startswith('tag:'):
+            selected = {}
+            for path, verb in self.tags.get(selector[len('tag:'):], ()):
+                selected.setdefault(path, []).append(verb)
+            return list(selected.items())
+        return [(path, None) for path in self.matchPaths(selector)]
+
+    def matchDefinitions(self, pattern):
+        """The names of the definitions matching a pattern such as * or Pet*"""
+        return [name for name in self.definitions if fnmatchcase(name, pattern)]
+
+    def closure(self, names):
+        """The definitions reachable from names, names included"""
+        seen = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name in seen or name not in self.definitions:
+                continue
+            seen.add(name)
+            stack.extend(self.definitionRefs.get(name, ()))
+        return seen
+
+    def node(self, kind, name):
+        """
+        A node of the file: a definition, a path, the whole file when
+        kind is document, the names selected by a pattern when kind is
+        paths or definitions, or the global fields of the file (host,
+        schemes, ...) when kind is global
+        """
+        if kind == 'definition':
+            return self.definitions.get(name)
+        if kind == 'path':
+            return self.paths.get(name)
+        if kind == 'paths':
+            return self.selectPaths(name)
+        if kind == 'definitions':
+            return self.matchDefinitions(name)
+        if kind == 'document':
+            return self.data
+        return {k: v for k, v in self.data.items() if k not in ('definitions', 'paths')}
+
+    def nodeHash(self, kind, name=''):
+        key = (kind, name)
+        if key not in self.hashes:
+            payload = json.dumps(self.node(kind, name), sort_keys=True, default=str)
+            self.hashes[key] = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        return self.hashes[key]
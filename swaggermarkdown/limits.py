@@ -0,0 +1,32 @@
+"""
+Limits keeping the size of the rendered tables and examples bounded
+"""
+
+from collections import namedtuple
+
+LIMIT_KEYS = ('maxDepth', 'maxRows', 'maxExampleNodes', 'maxEnumValues')
+
+
+class Limits(namedtuple('Limits', LIMIT_KEYS)):
+    """
+    maxDepth: nesting levels of the tables and examples
+    maxRows: rows of a table
+    maxExampleNodes: values of an example
+    maxEnumValues: values of an enum shown in a table
+
+    A limit of 0 disables it.
+    """
+
+    __slots__ = ()
+
+    def override(self, config):
+        """These limits with the ones set in a configuration"""
+        values = {key: config[key] for key in LIMIT_KEYS if config.get(key) is not None}
+        return self._replace(**values) if values else self
+
+    def marker(self, name):
+        """Text replacing what is not rendered because of a limit"""
+        return f'... truncated ({name}: {getattr(self, name)})'
+
+
+DEFAULT_LIMITS = Limits(maxDepth=32, maxRows=2000, maxExampleNodes=10000, maxEnumValues=100)
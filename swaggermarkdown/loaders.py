@@ -0,0 +1,104 @@
+"""
+Parsers for swagger files, chosen by file extension or configuration
+"""
+
+import json
+import yaml
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+YamlBase = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class YamlLoader(YamlBase):
+    """
+    The C YAML loader when libyaml is available. Dates are left as
+    strings, like they would be in a JSON file.
+    """
+
+YamlLoader.yaml_implicit_resolvers = {
+    key: [r for r in resolvers if r[0] != 'tag:yaml.org,2002:timestamp']
+    for key, resolvers in YamlBase.yaml_implicit_resolvers.items()
+}
+
+
+class PureYamlLoader(yaml.SafeLoader):
+    """The pure Python YAML loader, without dates"""
+
+PureYamlLoader.yaml_implicit_resolvers = YamlLoader.yaml_implicit_resolvers
+
+
+def loadJson(raw):
+    return json.loads(raw)
+
+
+def loadOrjson(raw):
+    return orjson.loads(raw)
+
+
+def loadUjson(raw):
+    return ujson.loads(raw)
+
+
+def loadYaml(raw):
+    return yaml.load(raw, Loader=YamlLoader)
+
+
+def loadPureYaml(raw):
+    return yaml.load(raw, Loader=PureYamlLoader)
+
+
+LOADERS = {
+    'json': loadJson,
+    'yaml': loadYaml,
+    'yaml-pure': loadPureYaml,
+}
+if orjson is not None:
+    LOADERS['orjson'] = loadOrjson
+if ujson is not None:
+    LOADERS['ujson'] = loadUjson
+
+# the fastest JSON parser installed
+FAST_JSON = 'orjson' if orjson is not None else 'ujson' if ujson is not None else 'json'
+
+EXTENSIONS = {
+    '.json': FAST_JSON,
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+}
+
+
+def isSpecFile(name):
+    return name.lower().endswith(tuple(EXTENSIONS))
+
+
+def loaderName(file, name=''):
+    """
+    name if given, or the name of the loader matching the file extension.
+    Files without a known extension are parsed as JSON.
+    """
+    if name:
+        if name not in LOADERS:
+            raise ValueError(f'Unknown swagger loader "{name}", available loaders: {", ".join(LOADERS)}')
+        return name
+    for extension, loader in EXTENSIONS.items():
+        if file.lower().endswith(extension):
+            return loader
+    return FAST_JSON
+
+
+def getLoader(file, name=''):
+    return LOADERS[loaderName(file, name)]
+
+
+def isJson(file, name=''):
+    return loaderName(file, name) in ('json', 'orjson', 'ujson')
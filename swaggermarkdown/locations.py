@@ -0,0 +1,109 @@
+"""
+Site wide index of the pages hosting the swagger definitions
+"""
+
+from .swaggermarkdown import scanDirectives, Directive, SwaggerDefinition
+from .spec import specCache as defaultSpecCache, LOAD_ERRORS
+from .index import isSelection
+import posixpath
+import hashlib
+import logging
+import json
+
+log = logging.getLogger('swaggermarkdown')
+
+
+def relativeUrl(url, page):
+    """url relative to the page url, both relative to the root of the site"""
+    if url == page:
+        return ''
+    directory = page[:page.rfind('/') + 1]
+    relative = posixpath.relpath(url or '.', directory or '.')
+    if url == '' or url.endswith('/'):
+        relative = f'{relative}/'
+    return relative
+
+
+class DefinitionLocations():
+    """
+    The page hosting each definition of a site, read from the :swg-def:
+    directives of every page before the pages are converted. update only
+    scans again the pages whose markdown, or the swagger files of their
+    selections, changed. A definition on several pages is linked to the
+    first one. page is the url of the page being converted.
+    """
+
+    def __init__(self, file='swagger.json', specCache=None):
+        self.defaultFile = file
+        self.specCache = defaultSpecCache if specCache is None else specCache
+        # page url -> {'key': sha1 of the markdown, 'names': [...], 'files': {path: digest}}
+        self.pages = {}
+        # definition name -> page url
+        self.locations = {}
+        self.page = None
+        self.scans = 0
+
+    def digest(self, file):
+        try:
+            return self.specCache.load(file).digest
+        except LOAD_ERRORS:
+            return None
+
+    def scan(self, markdown):
+        """The definitions of a page, and the digests of the files of its selections"""
+        self.scans += 1
+        names = []
+        files = {}
+        for item in scanDirectives(markdown.split('\n')):
+            if not isinstance(item, Directive) or item.handler is not SwaggerDefinition:
+                continue
+            name = SwaggerDefinition().getDefinitionName(item.line)
+            if not isSelection(name):
+                names.append(name)
+                continue
+            file = item.file(self.defaultFile)
+            try:
+                spec = self.specCache.load(file)
+            except LOAD_ERRORS as error:
+                # reported when the page is converted
+                log.warning(f'unable to load {file}: {error}')
+                files[file] = None
+                continue
+            files[file] = spec.digest
+            names.extend(spec.index.matchDefinitions(name))
+        return names, files
+
+    def update(self, pages):
+        """
+        Index the pages, (url, markdown) pairs in the order of the site,
+        return True if a definition moved to another page
+        """
+        previous = self.locations
+        entries = {}
+        for url, markdown in pages:
+            key = hashlib.sha1(markdown.encode('utf-8')).hexdigest()
+            entry = self.pages.get(url)
+            if (entry is None or entry['key'] != key
+                    or any(self.digest(file) != digest for file, digest in entry['files'].items())):
+                names, files = self.scan(markdown)
+                entry = {'key': key, 'names': names, 'files': files}
+            entries[url] = entry
+
+        self.pages = entries
+        self.locations = {}
+        for url, entry in entries.items():
+            for name in entry['names']:
+                self.locations.setdefault(name, url)
+        return self.locations != previous
+
+    def version(self):
+        """Changes when a definition moves to another page"""
+        return hashlib.sha1(json.dumps(self.locations, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def links(self, page=None):
+        """Definition name -> url of the page hosting it, relative to page"""
+        page = self.page if page is None else page
+        if page is None:
+            return {}
+        urls = {url: relativeUrl(url, page) for url in self.pages}
+        return {name: urls[url] for name, url in self.locations.items()}
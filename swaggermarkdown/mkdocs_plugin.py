@@ -0,0 +1,147 @@
+"""
+MkDocs plugin rendering again only the pages whose swagger content changed
+
+    plugins:
+      - swaggermarkdown:
+          stats: true   # log a summary of the rendering times at the end of the build
+          definitionLocations: true   # link each definition to the page hosting it
+
+    markdown_extensions:
+      - swaggermarkdown
+"""
+
+from mkdocs.plugins import BasePlugin
+from mkdocs.config import config_options
+from .dependencies import dependencyListeners
+from .swaggermarkdown import SwaggerExtension
+from .stats import RenderStats
+from .locations import DefinitionLocations
+import hashlib
+import logging
+import json
+
+log = logging.getLogger('mkdocs.plugins.swaggermarkdown')
+
+# what MkDocs collects while converting a page, besides the HTML: the table
+# of contents, the title of the first heading and the anchors (MkDocs 1.5+)
+RENDERED = ('toc', '_title_from_render', 'present_anchor_ids')
+
+
+class SwaggerMarkdownPlugin(BasePlugin):
+    """
+    Remember the HTML and the swagger dependencies of each page. On the
+    next build of `mkdocs serve`, a page with the same markdown whose
+    dependencies did not change is not converted again.
+
+    Before the pages are converted, the :swg-def: directives of the whole
+    site are indexed in a DefinitionLocations, so a link to a definition
+    goes to the page hosting it. Only the pages that changed since the
+    previous build are scanned again.
+    """
+
+    config_scheme = (
+        ('stats', config_options.Type(bool, default=False)),
+        ('definitionLocations', config_options.Type(bool, default=True)),
+    )
+
+    def on_startup(self, command, dirty):
+        # implementing on_startup keeps this instance alive between the builds of mkdocs serve
+        self.pages = {}
+        self.locations = None
+
+    def on_config(self, config):
+        if not hasattr(self, 'pages'):
+            self.pages = {}
+            self.locations = None
+        self.reused = {}
+        self.last = None
+        if self.listen not in dependencyListeners:
+            dependencyListeners.append(self.listen)
+        # anything changing the conversion of every page
+        self.settings = json.dumps([config['markdown_extensions'], config['mdx_configs']],
+            sort_keys=True, default=str)
+        self.stats = RenderStats()
+        # the files are read with the settings of the extension (loader, lazyLoadSize, specRoot, ...)
+        self.specCache = SwaggerExtension(**(config['mdx_configs'].get('swaggermarkdown') or {})).specCacheView()
+        if self.config['stats']:
+            config['mdx_configs'].setdefault('swaggermarkdown', {})['statsCallback'] = self.stats.merge
+        if self.config['definitionLocations']:
+            mdxConfig = config['mdx_configs'].setdefault('swaggermarkdown', {})
+            file = mdxConfig.get('file', 'swagger.json')
+            if self.locations is None or self.locations.defaultFile != file:
+                self.locations = DefinitionLocations(file)
+            self.locations.specCache = self.specCache
+            mdxConfig['definitionLocations'] = self.locations
+        else:
+            self.locations = None
+        return config
+
+    def on_files(self, files, config):
+        names = sorted(f.src_uri for f in files)
+        version = None
+        if self.locations is not None:
+            scans = self.locations.scans
+            pages = []
+            for f in files.documentation_pages():
+                with open(f.abs_src_path, encoding='utf-8-sig') as source:
+                    pages.append((f.url, source.read()))
+            if self.locations.update(pages) and self.pages:
+                log.info('swaggermarkdown: definitions moved to other pages, every page is rendered again')
+            log.debug(f'swaggermarkdown: {self.locations.scans - scans} pages scanned for definitions')
+            version = self.locations.version()
+        # the links to the definitions of other pages are part of the HTML
+        self.siteKey = hashlib.sha1(json.dumps([self.settings, names, version]).encode('utf-8')).hexdigest()
+        return files
+
+    def listen(self, dependencies):
+        self.last = dependencies
+
+    def key(self, markdown):
+        return hashlib.sha1(f'{self.siteKey}\n{markdown}'.encode('utf-8')).hexdigest()
+
+    def on_page_markdown(self, markdown, page, config, files):
+        self.last = None
+        if self.locations is not None:
+            self.locations.page = page.url
+        uri = page.file.src_uri
+        entry = self.pages.get(uri)
+        if entry and entry['key'] == self.key(markdown) and not entry['dependencies'].changed(self.specCache):
+            self.reused[uri] = entry
+            # nothing left to convert, the previous HTML is restored in on_page_content
+            return ''
+        self.reused.pop(uri, None)
+        self.pages[uri] = {'key': self.key(markdown)}
+        return markdown
+
+    def on_page_content(self, html, page, config, files):
+        uri = page.file.src_uri
+        entry = self.reused.get(uri)
+        if entry:
+            for name, value in entry['rendered'].items():
+                setattr(page, name, value)
+            if entry['links'] is not None:
+                # the links to the anchors of the files of this build
+                page.links_to_anchors = {files.get_file_from_path(target): links
+                    for target, links in entry['links'].items() if files.get_file_from_path(target)}
+            return entry['html']
+
+        dependencies = self.last
+        if dependencies:
+            links = getattr(page, 'links_to_anchors', None)
+            self.pages[uri].update(html=html, dependencies=dependencies,
+                rendered={name: getattr(page, name) for name in RENDERED if hasattr(page, name)},
+                links=None if links is None else {target.src_uri: dict(value) for target, value in links.items()})
+        else:
+            # without swagger content the page is cheap to convert
+            self.pages.pop(uri, None)
+        return html
+
+    def on_post_build(self, config):
+        if self.reused:
+            log.info(f'swaggermarkdown: {len(self.reused)} unchanged pages were not rendered again')
+        if self.config['stats']:
+            log.info(f'swaggermarkdown: {self.stats.summary()}')
+
+    def on_shutdown(self):
+        if self.listen in dependencyListeners:
+            dependencyListeners.remove(self.listen)
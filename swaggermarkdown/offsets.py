@@ -0,0 +1,148 @@
+"""
+Byte offsets of the definitions and paths of large JSON swagger files
+
+Only the parts of the file needed by a directive are parsed, the file
+itself is memory mapped. The offsets are saved in a sidecar file next to
+the swagger file and rebuilt when its modification time or size changes.
+"""
+
+from .index import walkRefs, LOCAL
+import hashlib
+import mmap
+import json
+import os
+import re
+
+# everything up to the next bracket outside of a string, the bracket is captured
+BRACKET = re.compile(rb'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*([{}\[\]])', re.S)
+STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.S)
+SPACE = re.compile(rb'[\s:,]*')
+SCALAR = re.compile(rb'[^\s,}\]]*')
+
+SECTIONS = ('definitions', 'paths')
+
+
+def skipSpace(buffer, pos):
+    return SPACE.match(buffer, pos).end()
+
+
+def valueEnd(buffer, pos):
+    """The end of the JSON value starting at pos"""
+    first = buffer[pos:pos + 1]
+    if first == b'"':
+        return STRING.match(buffer, pos).end()
+    if first not in (b'{', b'['):
+        return SCALAR.match(buffer, pos).end()
+    depth = 0
+    for match in BRACKET.finditer(buffer, pos):
+        token = match.group(1)
+        if token in (b'{', b'['):
+            depth += 1
+        elif token in (b'}', b']'):
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError('Unexpected end of JSON file')
+
+
+def members(buffer, pos):
+    """Yield the key, start and end of each member of the object starting at pos"""
+    pos = skipSpace(buffer, pos + 1)
+    while buffer[pos:pos + 1] != b'}':
+        key = STRING.match(buffer, pos)
+        if key is None:
+            raise ValueError(f'Expected a key at byte {pos}')
+        start = skipSpace(buffer, key.end())
+        end = valueEnd(buffer, start)
+        yield json.loads(key.group()), start, end
+        pos = skipSpace(buffer, end)
+
+
+def buildOffsets(buffer):
+    offsets = {'global': {}, 'definitions': {}, 'paths': {}}
+    start = skipSpace(buffer, 0)
+    for key, start, end in members(buffer, start):
+        if key in SECTIONS and buffer[start:start + 1] == b'{':
+            for name, s, e in members(buffer, start):
+                offsets[key][name] = [s, e]
+        else:
+            offsets['global'][key] = [start, end]
+    return offsets
+
+
+class OffsetIndex():
+    """
+    Parse single definitions and paths of a JSON swagger file without
+    loading the whole file.
+    """
+
+    def __init__(self, path, loads=json.loads):
+        self.path = path
+        self.loads = loads
+        self.sidecar = f'{path}.offsets.json'
+        stat = os.stat(path)
+        self.stamp = [stat.st_mtime_ns, stat.st_size]
+        # the map keeps its own descriptor, it is closed with the map
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = self.readSidecar() or self.build()
+
+    def readSidecar(self):
+        try:
+            with open(self.sidecar) as f:
+                offsets = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if offsets.get('stamp') != self.stamp:
+            return None
+        return offsets
+
+    def build(self):
+        offsets = buildOffsets(self.buffer)
+        offsets['stamp'] = self.stamp
+        offsets['digest'] = hashlib.sha256(self.buffer).hexdigest()
+        try:
+            with open(self.sidecar, 'w') as f:
+                json.dump(offsets, f)
+        except OSError:
+            # a read only directory, the offsets only live in memory
+            pass
+        return offsets
+
+    @property
+    def digest(self):
+        return self.offsets['digest']
+
+    def parse(self, section, name):
+        start, end = self.offsets[section][name]
+        return self.loads(self.buffer[start:end])
+
+    def partial(self, definitions=(), paths=()):
+        """
+        A swagger document with the global fields, the given paths and
+        definitions, and every definition they reference
+        """
+        data = {key: self.parse('global', key) for key in self.offsets['global']}
+        data['paths'] = {}
+        data['definitions'] = {}
+        pending = list(definitions)
+        for name in paths:
+            if name in self.offsets['paths']:
+                data['paths'][name] = self.parse('paths', name)
+                pending.extend(refDefinitions(data['paths'][name]))
+        while pending:
+            name = pending.pop()
+            if name in data['definitions'] or name not in self.offsets['definitions']:
+                continue
+            data['definitions'][name] = self.parse('definitions', name)
+            pending.extend(refDefinitions(data['definitions'][name]))
+        return data
+
+    def close(self):
+        self.buffer.close()
+
+
+def refDefinitions(obj):
+    for ref in walkRefs(obj):
+        if ref.startswith(LOCAL):
+            yield ref[len(LOCAL):]
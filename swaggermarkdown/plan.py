@@ -0,0 +1,79 @@
+"""
+Directive configurations compiled once for each distinct configuration
+"""
+
+from .loaders import YamlLoader
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+import threading
+import logging
+import yaml
+
+log = logging.getLogger('swaggermarkdown')
+
+# handler: the handler class of the directive
+# text: the indented YAML configuration, config: the parsed configuration
+# settings: the configuration as used by the handler
+# unknown: the keys the handler does not know about
+DirectivePlan = namedtuple('DirectivePlan', 'handler text config settings unknown')
+
+
+def unknownKeys(config, known, prefix=''):
+    """
+    The keys of config missing from known, a dict of the accepted keys
+    with the accepted nested keys as value, or None if they are not checked
+    """
+    unknown = []
+    for key, value in config.items():
+        if key not in known:
+            unknown.append(f'{prefix}{key}')
+        elif known[key] is not None and isinstance(value, dict):
+            unknown.extend(unknownKeys(value, known[key], f'{prefix}{key}.'))
+    return unknown
+
+
+def compilePlan(handler, text, line=''):
+    config = yaml.load(text, Loader=YamlLoader) if text else None
+    if config is None:
+        config = {}
+    if not isinstance(config, dict):
+        raise ValueError(f'{line}: the configuration must be a mapping')
+    unknown = tuple(unknownKeys(config, handler.configKeys))
+    if unknown:
+        log.warning(f'{line}: unknown configuration {", ".join(unknown)}')
+    return DirectivePlan(handler, text, MappingProxyType(config),
+        MappingProxyType(handler.compileConfig(config)), unknown)
+
+
+class PlanCache():
+    """
+    A bounded LRU cache of DirectivePlan keyed by the handler and the
+    text of the configuration. Plans are shared and never modified.
+    """
+
+    def __init__(self, maxSize=1024):
+        self.maxSize = maxSize
+        self.plans = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, handler, configLines, line=''):
+        key = (handler, '\n'.join(configLines))
+        with self.lock:
+            plan = self.plans.get(key)
+            if plan is not None:
+                self.plans.move_to_end(key)
+                return plan
+
+        plan = compilePlan(handler, key[1], line)
+        with self.lock:
+            self.plans[key] = plan
+            while len(self.plans) > max(self.maxSize, 0):
+                self.plans.popitem(last=False)
+        return plan
+
+    def clear(self):
+        with self.lock:
+            self.plans.clear()
+
+
+planCache = PlanCache()
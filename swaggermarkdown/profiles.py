@@ -0,0 +1,138 @@
+"""
+Output profiles, the whitespace put in the rendered tables and examples
+"""
+
+from collections import namedtuple
+import json
+
+PROFILES = ('pretty', 'compact')
+
+
+class PrettyHtml():
+    """The HTML of the tables and paths, indented"""
+
+    def definitionTable(self, id, body):
+        return f"""<table data-type="sw-table" id="/definitions/{id}"> 
+        <thead><tr><th>Name</th><th>Type</th><th>Details</th></tr></thead>
+        <tbody>{body}</tbody>
+        </table>
+        """
+
+    def definitionRow(self, id, name, type, details):
+        return f'''<tr id="{id}">
+          <td>{name}</td>
+          <td>{type}</td>
+          <td>{details}</td>
+        </tr>'''
+
+    def pathLine(self, verb, path):
+        return f'''<p class="sw-path">
+                <span class="sw-verb">{verb}</span>
+                <span class="sw-path-url">{path}</span></p>'''
+
+    def responsesTable(self, path, produces, body):
+        return f"""<table data-type="sw-table" id="/paths{path}/responses">
+        <caption>Responses {produces}</caption>
+        <thead><tr><th>Code</th><th>Description</th><th>Body</th></tr></thead>
+        <tbody>{body}</tbody>
+        </table>
+        """
+
+    def responseRow(self, name, description, schema):
+        return f'''<tr>
+            <td>{name}</td>
+            <td>{description}</td>
+            <td>{schema}</td>
+        </tr>'''
+
+    def parametersTable(self, path, body):
+        return f"""<table data-type="sw-table" id="/paths{path}/parameters">
+        <caption>Parameters</caption>
+        <thead><tr><th>Name</th><th>Type</th><th>Details</th></tr></thead>
+        <tbody>{body}</tbody>
+        </table>
+        """
+
+    def parameterRow(self, name, type, details):
+        return f'''<tr>
+            <td>{name}</td>
+            <td>{type}</td>
+            <td>{details}</td>
+        </tr>'''
+
+    def truncatedRow(self, marker):
+        return f'''<tr data-type="sw-truncated">
+          <td colspan="3"><em>{marker}</em></td>
+        </tr>'''
+
+
+class CompactHtml(PrettyHtml):
+    """The same HTML without the indentation, written directly rather than stripped"""
+
+    def definitionTable(self, id, body):
+        return (f'<table data-type="sw-table" id="/definitions/{id}"><thead><tr><th>Name</th><th>Type</th>'
+            f'<th>Details</th></tr></thead><tbody>{body}</tbody></table>\n')
+
+    def definitionRow(self, id, name, type, details):
+        return f'<tr id="{id}"><td>{name}</td><td>{type}</td><td>{details}</td></tr>'
+
+    def pathLine(self, verb, path):
+        return f'<p class="sw-path"> <span class="sw-verb">{verb}</span> <span class="sw-path-url">{path}</span></p>'
+
+    def responsesTable(self, path, produces, body):
+        return (f'<table data-type="sw-table" id="/paths{path}/responses"><caption>Responses {produces}</caption>'
+            f'<thead><tr><th>Code</th><th>Description</th><th>Body</th></tr></thead><tbody>{body}</tbody></table>\n')
+
+    def responseRow(self, name, description, schema):
+        return f'<tr><td>{name}</td><td>{description}</td><td>{schema}</td></tr>'
+
+    def parametersTable(self, path, body):
+        return (f'<table data-type="sw-table" id="/paths{path}/parameters"><caption>Parameters</caption>'
+            f'<thead><tr><th>Name</th><th>Type</th><th>Details</th></tr></thead><tbody>{body}</tbody></table>\n')
+
+    def parameterRow(self, name, type, details):
+        return f'<tr><td>{name}</td><td>{type}</td><td>{details}</td></tr>'
+
+    def truncatedRow(self, marker):
+        return f'<tr data-type="sw-truncated"><td colspan="3"><em>{marker}</em></td></tr>'
+
+
+PRETTY_HTML = PrettyHtml()
+COMPACT_HTML = CompactHtml()
+
+
+class OutputProfile(namedtuple('OutputProfile', 'name exampleIndent exampleSeparators')):
+    """
+    pretty: indented tables and examples, the default
+    compact: tables without indentation and examples on one line
+    exampleIndent and exampleSeparators are the indent and separators
+    arguments of json.dumps for the examples.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, name='pretty', exampleIndent=None, exampleSeparators=None):
+        if name not in PROFILES:
+            raise ValueError(f'unknown outputProfile {name!r}, use one of {", ".join(PROFILES)}')
+        compact = name == 'compact'
+        if exampleIndent is None:
+            exampleIndent = None if compact else 2
+        if exampleSeparators is None:
+            exampleSeparators = (',', ':') if compact else None
+        elif len(exampleSeparators) != 2:
+            raise ValueError('exampleSeparators must be an item and a key separator')
+        else:
+            exampleSeparators = tuple(exampleSeparators)
+        return cls(name, exampleIndent, exampleSeparators)
+
+    @property
+    def html(self):
+        """The templates of the tables and paths"""
+        return COMPACT_HTML if self.name == 'compact' else PRETTY_HTML
+
+    def example(self, value):
+        return json.dumps(value, indent=self.exampleIndent, separators=self.exampleSeparators)
+
+
+PRETTY = OutputProfile.create()
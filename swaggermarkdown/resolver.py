@@ -0,0 +1,86 @@
+"""
+Resolution of $ref pointing to other files, such as common.json#/definitions/Error
+"""
+
+from .index import resolvePointer
+from .spec import SpecLoadError, LOAD_ERRORS
+from .stats import nullStats
+import threading
+import os
+
+
+def splitRef(ref):
+    """The file and the JSON pointer of a $ref, the file is empty for a local $ref"""
+    file, _, pointer = ref.partition('#')
+    return file, pointer
+
+
+class DocumentPool():
+    """
+    The swagger files referenced while converting a document. Each file is
+    taken from the spec cache once, and each pointer is resolved once.
+    """
+
+    def __init__(self, specCache, stats=nullStats):
+        self.specCache = specCache
+        self.stats = stats
+        # path -> Spec
+        self.documents = {}
+        # (path, pointer) -> node
+        self.pointers = {}
+        self.lock = threading.Lock()
+
+    def document(self, path):
+        with self.lock:
+            spec = self.documents.get(path)
+        if spec is None:
+            try:
+                spec = self.specCache.load(path, stats=self.stats)
+            except LOAD_ERRORS as error:
+                raise SpecLoadError(None, path, error) from error
+            with self.lock:
+                spec = self.documents.setdefault(path, spec)
+        return spec
+
+    def resolve(self, base, ref):
+        """
+        The Spec and the node a $ref found in the file base points to,
+        the node is None if the pointer does not exist
+        """
+        file, pointer = splitRef(ref)
+        path = os.path.realpath(os.path.join(os.path.dirname(base), file)) if file else base
+        spec = self.document(path)
+        key = (path, pointer)
+        with self.lock:
+            if key in self.pointers:
+                return spec, self.pointers[key]
+        node = resolvePointer(spec.data, pointer)
+        with self.lock:
+            self.pointers[key] = node
+        return spec, node
+
+
+class RefResolver():
+    """
+    Resolve the $ref of one directive through a shared DocumentPool and
+    remember the digest of every other file used.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        # path -> sha256 of the files used besides the one of the directive
+        self.used = {}
+
+    def resolve(self, base, ref):
+        spec, node = self.pool.resolve(base, ref)
+        self.used[spec.path] = spec.digest
+        return spec, node
+
+    def current(self, path, digest):
+        """True if the file still has this digest"""
+        try:
+            spec = self.pool.document(path)
+        except SpecLoadError:
+            return False
+        self.used[spec.path] = spec.digest
+        return spec.digest == digest
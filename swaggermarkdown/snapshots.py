@@ -0,0 +1,131 @@
+"""
+On disk snapshots of parsed swagger files, faster to load than the files themselves
+"""
+
+from . import __version__
+import threading
+import hashlib
+import marshal
+import sys
+import gc
+import os
+
+
+# a snapshot is only read by the version of the extension and of Python that wrote it
+SNAPSHOT_TAG = hashlib.sha1(f'{__version__} {sys.version} {marshal.version}'.encode('utf-8')).hexdigest()[:12]
+
+# raised by marshal for a truncated or corrupt snapshot
+CORRUPT_ERRORS = (EOFError, ValueError, TypeError)
+
+
+class SnapshotCache():
+    """
+    The parsed content and the compiled SpecIndex of swagger files, stored
+    with marshal in a directory and keyed by the sha256 of the file content.
+    Snapshots written by another version are removed when the cache is
+    created, corrupt ones when they are read. When the directory grows over
+    maxSize bytes the least recently used snapshots are removed.
+    """
+
+    suffix = '.snapshot'
+
+    def __init__(self, directory, maxSize=256 * 1024 * 1024):
+        self.directory = directory
+        self.maxSize = maxSize
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        for filename, _, _ in self.files():
+            if not filename.endswith(f'-{SNAPSHOT_TAG}{self.suffix}'):
+                self.remove(filename)
+
+    def filename(self, digest):
+        return os.path.join(self.directory, f'{digest}-{SNAPSHOT_TAG}{self.suffix}')
+
+    def files(self):
+        out = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                out.append((entry.path, stat.st_mtime, stat.st_size))
+        return out
+
+    def remove(self, filename):
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            pass
+
+    def get(self, digest):
+        """(data, index state) of the file with this digest, or None"""
+        filename = self.filename(digest)
+        try:
+            with open(filename, 'rb') as snapshot:
+                raw = snapshot.read()
+            # the modification time is used to find the least recently used snapshots
+            os.utime(filename)
+        except FileNotFoundError:
+            return None
+
+        # the collector would walk the whole document several times while it is built
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            saved, data, state = marshal.loads(raw)
+        except CORRUPT_ERRORS:
+            saved = None
+        finally:
+            if enabled:
+                gc.enable()
+        if saved != digest:
+            self.remove(filename)
+            return None
+        return data, state
+
+    def set(self, digest, data, state):
+        try:
+            raw = marshal.dumps((digest, data, state))
+        except ValueError:
+            # values marshal does not support, like the dates of a YAML file
+            return
+        filename = self.filename(digest)
+        temporary = f'{filename}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as snapshot:
+            snapshot.write(raw)
+        os.replace(temporary, filename)
+        with self.lock:
+            self.shrink()
+
+    def shrink(self):
+        files = self.files()
+        size = sum(size for _, _, size in files)
+        for filename, _, fileSize in sorted(files, key=lambda f: f[1]):
+            if size <= self.maxSize:
+                break
+            self.remove(filename)
+            size -= fileSize
+
+    def clear(self):
+        with self.lock:
+            for filename, _, _ in self.files():
+                self.remove(filename)
+
+
+# directory -> SnapshotCache shared by the markdown instances of the process
+snapshotCaches = {}
+snapshotCachesLock = threading.Lock()
+
+
+def snapshotCache(directory):
+    """The SnapshotCache of a directory, None if directory is empty"""
+    if not directory:
+        return None
+    with snapshotCachesLock:
+        cache = snapshotCaches.get(directory)
+        if cache is None:
+            cache = snapshotCaches[directory] = SnapshotCache(directory)
+        return cache
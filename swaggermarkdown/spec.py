@@ -0,0 +1,257 @@
+"""
+Process wide cache of parsed swagger files
+"""
+
+from .examples import ExampleEngine
+from .index import SpecIndex
+from .loaders import getLoader, loaderName, isJson
+from .offsets import OffsetIndex
+from .stats import nullStats
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import weakref
+import yaml
+import hashlib
+import os
+
+
+# raised when a swagger file is missing or cannot be parsed
+LOAD_ERRORS = (OSError, ValueError, yaml.YAMLError)
+
+
+class SpecLoadError(Exception):
+    """A swagger file used by a directive could not be loaded"""
+
+    def __init__(self, line, file, error):
+        self.line = line
+        self.file = file
+        self.error = error
+        message = f'unable to load {file}: {error}'
+        super(SpecLoadError, self).__init__(f'{line}: {message}' if line else message)
+
+    def __reduce__(self):
+        # raised in worker processes too
+        return (SpecLoadError, (self.line, self.file, self.error))
+
+
+class Spec():
+    """A parsed swagger file"""
+
+    def __init__(self, path, data, digest, state=None, selection=None):
+        self.path = path
+        self.data = data
+        # sha256 of the file content
+        self.digest = digest
+        # (definitions, paths) parsed from a large file, None if it is fully parsed
+        self.selection = selection
+        self.index = SpecIndex(data, state)
+        self.engines = {}
+        self.lock = threading.Lock()
+
+    def examples(self, seed=''):
+        """The example engine of this file, shared by all directives"""
+        with self.lock:
+            if seed not in self.engines:
+                self.engines[seed] = ExampleEngine(self.index, seed, self.path)
+            return self.engines[seed]
+
+    def covers(self, selection):
+        """True if the definitions and paths of a selection are parsed"""
+        if self.selection is None:
+            return True
+        return selection is not None and selection[0] <= self.selection[0] and selection[1] <= self.selection[1]
+
+
+class SpecCache():
+    """
+    A bounded LRU cache of parsed swagger files.
+
+    Entries are keyed by the resolved path of the file together with its
+    modification time, its size and the loader parsing it, so an edited
+    file is parsed again while an untouched one is parsed only once per
+    process. A partially parsed file is a single entry too, parsed again
+    with the union of the selections when a directive needs more of it.
+
+    A view shares the parsed files of the cache with its own settings,
+    each markdown instance uses one. The cache keeps as many files as
+    the largest maxSize of its views, a view with a maxSize of 0 parses
+    the files each time. With a root, the files outside of this directory
+    cannot be read.
+    """
+
+    def __init__(self, maxSize=16, loader='', lazySize=0, snapshots=None, shared=None, root=None):
+        self.maxSize = maxSize
+        # the name of the loader used for all files, by default it depends on the file extension
+        self.loader = loader
+        # JSON files of this size or more are only partially parsed (disabled if 0)
+        self.lazySize = lazySize
+        # SnapshotCache of the parsed files (disabled if None)
+        self.snapshots = snapshots
+        self.root = root and os.path.realpath(root)
+        # the cache holding the parsed files, this one unless it is a view
+        self.shared = self if shared is None else shared
+        if shared is None:
+            self.entries = OrderedDict()
+            # path -> OffsetIndex of the large files
+            self.offsets = {}
+            self.lock = threading.Lock()
+            self.views = weakref.WeakSet()
+        else:
+            self.entries = shared.entries
+            self.offsets = shared.offsets
+            self.lock = shared.lock
+            self.views = shared.views
+            with self.lock:
+                self.views.add(self)
+
+    def view(self, maxSize=16, loader='', lazySize=0, snapshots=None, root=None):
+        """A cache sharing the parsed files of this one, with its own settings"""
+        return SpecCache(maxSize, loader, lazySize, snapshots, shared=self.shared, root=root)
+
+    def key(self, file):
+        path = os.path.realpath(file)
+        if self.root and os.path.commonpath([self.root, path]) != self.root:
+            raise PermissionError(f'{file} is outside of {self.root}')
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size)
+
+    def parse(self, path, stats=nullStats):
+        with open(path, 'rb') as spec_file:
+            raw = spec_file.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        snapshots = self.snapshots
+        if snapshots is not None:
+            snapshot = snapshots.get(digest)
+            if snapshot is not None:
+                stats.count('snapshotHits')
+                data, state = snapshot
+                return Spec(path, data, digest, state)
+        data = getLoader(path, self.loader)(raw)
+        spec = Spec(path, data, digest)
+        if snapshots is not None:
+            snapshots.set(digest, data, spec.index.state())
+        return spec
+
+    def isLazy(self, key):
+        return self.lazySize and key[2] >= self.lazySize and isJson(key[0], self.loader)
+
+    def parsePartial(self, path, stamp, definitions, paths):
+        loads = getLoader(path, self.loader)
+        with self.lock:
+            offsets = self.offsets.get(path)
+        if offsets is None or offsets.stamp != list(stamp) or offsets.loads is not loads:
+            # built without the lock, the replaced index may still be read
+            # by other threads and is released once they are done
+            offsets = OffsetIndex(path, loads)
+            with self.lock:
+                self.offsets[path] = offsets
+        data = offsets.partial(sorted(definitions), sorted(paths))
+        # the referenced definitions are parsed too
+        selection = (definitions | set(data['definitions']), paths | set(data['paths']))
+        return Spec(path, data, offsets.digest, selection=selection)
+
+    def load(self, file, definitions=None, paths=None, stats=nullStats):
+        """
+        The parsed file. When the file is larger than lazySize and a selection
+        of definitions or paths is given, only those and the definitions they
+        reference are parsed.
+        """
+        # the same file parsed by another loader is another entry
+        key = self.key(file) + (loaderName(file, self.loader),)
+        selection = None
+        if (definitions or paths) and self.isLazy(key):
+            selection = (frozenset(definitions or ()), frozenset(paths or ()))
+        if self.maxSize <= 0:
+            stats.count('specLoads')
+            return self.parsePartial(key[0], key[1:3], *selection) if selection else self.parse(key[0], stats)
+
+        with self.lock:
+            spec = self.entries.get(key)
+            if spec is not None and spec.covers(selection):
+                self.entries.move_to_end(key)
+                stats.count('specCacheHits')
+                return spec
+
+        stats.count('specLoads')
+        if selection:
+            if spec is not None:
+                # the directives of a file share one entry and its example engines
+                selection = (selection[0] | spec.selection[0], selection[1] | spec.selection[1])
+            spec = self.parsePartial(key[0], key[1:3], *selection)
+        else:
+            spec = self.parse(key[0], stats)
+
+        with self.lock:
+            # an older version of the same file is never going to be used again
+            for stale in [k for k in self.entries if k[0] == key[0] and k[1:3] != key[1:3]]:
+                del self.entries[stale]
+            self.entries[key] = spec
+            self.evict()
+        return spec
+
+    def prefetch(self, files, workers=4, stats=nullStats):
+        """
+        Parse the files that are not in the cache concurrently. Large files
+        that are only partially parsed are skipped. Return the exception
+        raised by each file that could not be loaded.
+        """
+        errors = {}
+        pending = []
+        for file in files:
+            try:
+                key = self.key(file)
+            except LOAD_ERRORS as error:
+                errors[file] = error
+                continue
+            with self.lock:
+                cached = key + (loaderName(file, self.loader),) in self.entries
+            if not cached and not self.isLazy(key):
+                pending.append(file)
+        if len(pending) < 2 or workers < 2:
+            # nothing to gain from a pool, the files are loaded when rendered
+            return errors
+
+        def load(file):
+            try:
+                self.load(file, stats=stats)
+            except LOAD_ERRORS as error:
+                errors[file] = error
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            list(executor.map(load, pending))
+        return errors
+
+    def changed(self):
+        """The files in the cache that were modified since they were parsed"""
+        with self.lock:
+            # partially parsed files are parsed again when used, they are not watched
+            stamps = {key[:3] for key, spec in self.entries.items() if spec.selection is None}
+        out = []
+        for path, mtime, size in stamps:
+            try:
+                if self.key(path)[1:] != (mtime, size):
+                    out.append(path)
+            except OSError:
+                pass
+        return out
+
+    def capacity(self):
+        """The number of files kept, the largest maxSize of the views or of the cache"""
+        return max([view.maxSize for view in self.views] or [self.shared.maxSize])
+
+    def evict(self):
+        while len(self.entries) > max(self.capacity(), 0):
+            self.entries.popitem(last=False)
+
+    def resize(self, maxSize):
+        with self.lock:
+            self.maxSize = maxSize
+            self.evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+specCache = SpecCache()
@@ -0,0 +1,146 @@
+"""
+Timings and counters of the rendered directives
+"""
+
+from collections import Counter
+import threading
+import time
+
+
+class Timer():
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.addTime(self.name, time.perf_counter() - self.start)
+
+
+class DirectiveTimer():
+
+    def __init__(self, stats, line):
+        self.stats = stats
+        self.record = {'line': line, 'seconds': 0.0, 'sections': {}, 'rows': 0, 'bytes': 0}
+
+    def __enter__(self):
+        self.stats.local.current = self.record
+        self.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, *exc):
+        self.record['seconds'] = time.perf_counter() - self.start
+        self.stats.local.current = None
+        with self.stats.lock:
+            self.stats.directives.append(self.record)
+            self.stats.counters['rows'] += self.record['rows']
+            self.stats.counters['bytes'] += self.record['bytes']
+
+
+class RenderStats():
+    """
+    Per directive wall time, split by section, and counters of spec loads,
+    cache hits, $ref resolutions, rows and bytes emitted.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.directives = []
+        self.counters = Counter()
+        self.lock = threading.Lock()
+        # the directive rendered by the current thread
+        self.local = threading.local()
+
+    def directive(self, line):
+        return DirectiveTimer(self, line)
+
+    def section(self, name):
+        return Timer(self, name)
+
+    def addTime(self, name, seconds):
+        record = getattr(self.local, 'current', None)
+        if record is not None:
+            record['sections'][name] = record['sections'].get(name, 0.0) + seconds
+
+    def count(self, name, value=1):
+        if name in ('rows', 'bytes'):
+            record = getattr(self.local, 'current', None)
+            if record is not None:
+                record[name] += value
+                return
+        with self.lock:
+            self.counters[name] += value
+
+    def merge(self, other):
+        with self.lock:
+            self.directives.extend(other.directives)
+            self.counters.update(other.counters)
+
+    @classmethod
+    def fromDict(cls, data):
+        """Stats returned by toDict, for example in another process"""
+        stats = cls()
+        stats.directives = list(data['directives'])
+        stats.counters.update(data['counters'])
+        return stats
+
+    def totalSeconds(self):
+        return sum(d['seconds'] for d in self.directives)
+
+    def sections(self):
+        out = Counter()
+        for d in self.directives:
+            out.update(d['sections'])
+        return out
+
+    def toDict(self):
+        return {
+            'directives': self.directives,
+            'counters': dict(self.counters),
+            'seconds': self.totalSeconds(),
+        }
+
+    def summary(self, top=10):
+        lines = [f'{len(self.directives)} swagger directives rendered in {self.totalSeconds():.3f}s']
+        for name, seconds in self.sections().most_common():
+            lines.append(f'  {name:<22} {seconds:.3f}s')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'  {name:<22} {value}')
+        slowest = sorted(self.directives, key=lambda d: d['seconds'], reverse=True)[:top]
+        if slowest:
+            lines.append('Slowest directives:')
+            for d in slowest:
+                lines.append(f'  {d["seconds"]:.3f}s {d["line"]}')
+        return '\n'.join(lines)
+
+
+class NullTimer():
+
+    def __enter__(self):
+        return {'rows': 0, 'bytes': 0, 'sections': {}}
+
+    def __exit__(self, *exc):
+        pass
+
+
+class NullStats():
+    """Used when the stats are disabled, does nothing"""
+
+    enabled = False
+
+    def directive(self, line):
+        return NullTimer()
+
+    def section(self, name):
+        return NullTimer()
+
+    def count(self, name, value=1):
+        pass
+
+
+nullStats = NullStats()
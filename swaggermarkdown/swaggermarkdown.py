@@ -6,14 +6,30 @@ Swagger pre-processor
 from markdown import util
 from markdown.preprocessors import Preprocessor
 from markdown.extensions import Extension
-import yaml
+from .spec import specCache as defaultSpecCache, SpecLoadError, LOAD_ERRORS
+from .fragments import FragmentCache
+from .snapshots import snapshotCache
+from .dependencies import PageDependencies, dependencyListeners
+from .loaders import isSpecFile
+from .resolver import DocumentPool, RefResolver
+from .plan import planCache
+from .index import isSelection
+from .limits import DEFAULT_LIMITS, LIMIT_KEYS
+from .profiles import OutputProfile, PRETTY
+from .stats import RenderStats, nullStats
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import threading
+import logging
 import json
 import re
-import uuid
 
+log = logging.getLogger('swaggermarkdown')
 
-def labelValue(out, content, label):
+
+def labelValue(out, content, label, limits=DEFAULT_LIMITS):
     value = content.get(label) or ''
+    if label == 'enum' and limits.maxEnumValues and isinstance(value, list) and len(value) > limits.maxEnumValues:
+        value = f'{value[:limits.maxEnumValues]} {limits.marker("maxEnumValues")}, {len(value)} values'
     if value:
         out.append(f'<span class="sw-label">{label}:</span> <span class="sw-value">{value}</span>')
 
@@ -30,6 +46,34 @@ def pathRepr(path, required):
 def idRepr(path):
     return '.'.join(path)
 
+# kinds of rendered chunks
+HTML = 'html'
+MARKDOWN = 'markdown'
+
+BLANK_LINE = re.compile(r'(?<=\n) +\n')
+
+def joinChunks(chunks):
+    return '\n'.join(text for _, text in chunks)
+
+def iterText(chunks):
+    """The text of chunks as joinChunks joins it, one piece at a time"""
+    separator = ''
+    for _, text in chunks:
+        yield separator
+        yield text
+        separator = '\n'
+
+def writeChunks(stream, chunks):
+    """Write chunks to a file-like object without joining them, return the number of characters"""
+    written = 0
+    for text in iterText(chunks):
+        stream.write(text)
+        written += len(text)
+    return written
+
+def truncatedRow(limits, name, html=PRETTY.html):
+    return html.truncatedRow(limits.marker(name))
+
 def isEmpty(objOrArray):
     if isinstance(objOrArray, list) and not len(objOrArray):
         return True
@@ -41,16 +85,35 @@ def isEmpty(objOrArray):
 
 class SwaggerDefinition():
 
-    def __init__(self, file=None, definitionsUrl='', definitionNames=[], config={}):
+    # the accepted configuration keys, with the accepted nested keys when they are checked
+    configKeys = dict({'properties': None}, **dict.fromkeys(LIMIT_KEYS))
+    excludeField = frozenset(['type', 'items', 'properties', 'required', '$ref', 'xml', 'format', 'name'])
+
+    def __init__(self, file=None, definitionsUrl='', definitionNames=[], config={}, specCache=None, options={}, stats=None,
+            documents=None, plan=None, definitionLinks={}):
         self.defaultFile = file
+        self.specCache = defaultSpecCache if specCache is None else specCache
+        self.stats = nullStats if stats is None else stats
+        # resolves the $ref to other files
+        self.resolver = RefResolver(documents or DocumentPool(self.specCache, self.stats))
         self.definitionsUrl = definitionsUrl
         self.definitionName = None
         self.definitionNames = definitionNames
-        self.excludeField = ['type', 'items', 'properties', 'required', '$ref', 'xml', 'format', 'name']
-
-        self.config = {
+        # name -> url of the page of the site hosting the definition
+        self.definitionLinks = definitionLinks
+        # the names matched by a selection directive
+        self.selection = None
+        # a DirectivePlan already holds the compiled configuration
+        self.config = self.compileConfig(config) if plan is None else plan.settings
+        self.limits = options.get('limits', DEFAULT_LIMITS).override(self.config)
+        self.output = options.get('output', PRETTY)
+        self.html = self.output.html
+
+    @staticmethod
+    def compileConfig(config):
+        return dict({
             "properties": config.get("properties", {})
-        }
+        }, **{key: config.get(key) for key in LIMIT_KEYS})
 
     def getDefinitionName(self, line):
         content = line.split(' ')
@@ -61,26 +124,76 @@ class SwaggerDefinition():
     # :swg-def: AccessibilityProperties
     # :swg-path: /my-project"
     def handleLine(self, line):
+        return self.render(self.load(line))
+
+    def load(self, line):
+        """
+        Load the swagger file of the directive and return the definition
+        """
         content = line.split(' ')
         file = content[1]
-        if not file.endswith('.json'):
+        if not isSpecFile(file):
           file = self.defaultFile
 
         self.definitionName = self.getDefinitionName(line)
 
-        with open(file) as json_file:
-            data = json.load(json_file)
-            defs = data['definitions']
-            definition = defs[self.definitionName]
-            return self.definitionTable(definition, self.definitionName)
+        if isSelection(self.definitionName):
+            # :swg-def: * or :swg-def: Pet*, every match is rendered by this directive
+            self.spec = self.specCache.load(file, stats=self.stats)
+            self.index = self.spec.index
+            self.selection = self.index.matchDefinitions(self.definitionName)
+            if not self.selection:
+                log.warning(f'{line}: no definition of {file} matches {self.definitionName}')
+            return [self.index.definitions[name] for name in self.selection]
+
+        return self.loadDefinition(file, self.definitionName)
+
+    def loadDefinition(self, file, name):
+        """
+        Load the swagger file and return one of its definitions, the name
+        is not parsed from a directive
+        """
+        self.definitionName = name
+        self.selection = None
+        self.spec = self.specCache.load(file, definitions=[name], stats=self.stats)
+        self.index = self.spec.index
+        return self.index.definitions[name]
+
+    def render(self, definition):
+        return joinChunks(self.renderChunks(definition))
+
+    def renderChunks(self, definition):
+        return list(self.iterChunks(definition))
+
+    def iterChunks(self, definition):
+        """The rendered tables, one at a time"""
+        if self.selection is None:
+            yield (HTML, self.definitionTable(definition, self.definitionName))
+            return
+        for name, node in zip(self.selection, definition):
+            yield (HTML, self.definitionTable(node, name))
+
+    def names(self):
+        """The definitions rendered by this directive"""
+        return [self.definitionName] if self.selection is None else self.selection
+
+    def references(self):
+        """Names of the definitions this directive may link to"""
+        refs = set()
+        for name in self.names():
+            refs |= self.index.definitionRefs.get(name, set())
+        return refs
+
+    def dependencies(self):
+        """The nodes of the swagger file used to render this directive"""
+        nodes = [('definition', name) for name in self.names()]
+        if self.selection is not None:
+            nodes.append(('definitions', self.definitionName))
+        return nodes
 
     def table(self, body, id):
         # some markdown theme disable all style if a class is present
-        return f"""<table data-type="sw-table" id="/definitions/{id}"> 
-        <thead><tr><th>Name</th><th>Type</th><th>Details</th></tr></thead>
-        <tbody>{body}</tbody>
-        </table>
-        """
+        return self.html.definitionTable(id, body)
 
     def propetyConfig(self, prop, name):
         config = self.config['properties']
@@ -92,13 +205,15 @@ class SwaggerDefinition():
         body = []
         required = definition.get('required', [])
         properties = definition.get('properties')
-        if properties:
-            for name, content in properties.items():
-                if self.propetyConfig(name, 'hide') == True:
-                    continue
-                self.addTableLine([defname], body, name, content, required)
-        else:
-            self.addTableLine([defname], body, defname, definition, required)
+        with self.stats.section('definitionRows'):
+            if properties:
+                for name, content in properties.items():
+                    if self.propetyConfig(name, 'hide') == True:
+                        continue
+                    if not self.addTableLine([defname], body, name, content, required):
+                        break
+            else:
+                self.addTableLine([defname], body, defname, definition, required)
     
         return self.table(body=''.join(body), id=defname)
 
@@ -108,11 +223,13 @@ class SwaggerDefinition():
         keys = content.keys()
         description = self.propetyConfig(name, 'description')
         if description:
-            content['description'] = description
+            # the parsed file is shared with other directives, never modify it
+            content = dict(content, description=description)
+            keys = content.keys()
 
         for detail in keys:
             if detail not in self.excludeField:
-                labelValue(out, content, detail)
+                labelValue(out, content, detail, self.limits)
 
         return '<br>'.join(out)
 
@@ -128,117 +245,248 @@ class SwaggerDefinition():
             return self.refLink(ref)
 
     def refLink(self, ref):
-        bits = ref.split('/')
-        name = bits[len(bits) - 1]
-        url = f'{self.definitionsUrl}{ref}'
+        self.stats.count('refLinks')
+        name = self.index.refName(ref)
+        anchor = self.index.refAnchor(ref)
+        url = f'{self.definitionsUrl}{anchor}'
         # if the current name is included in the current page, we can ignore definitionsUrl
         if name in self.definitionNames:
-            url = ref
+            url = anchor
+        elif name in self.definitionLinks:
+            url = f'{self.definitionLinks[name]}{anchor}'
 
         return f'<a href="{url}">{name}</a>' 
 
     def addTableLine(self, path, body: list, name, content, required=[]):
-        ctype = self.typeAndFormat(content)
-        details = self.details(content, name)
-        ctypeOut = ctype
+        """
+        Add the row of a property and the rows of the properties nested in it.
+        Return False when the table reached maxRows.
+        """
+        limits = self.limits
+        stack = [(path, name, content, required)]
+        while stack:
+            path, name, content, required = stack.pop()
+            if limits.maxRows and len(body) >= limits.maxRows:
+                body.append(truncatedRow(limits, 'maxRows', self.html))
+                return False
+
+            ctype = self.typeAndFormat(content)
+            details = self.details(content, name)
+            ctypeOut = ctype
+
+            # could create issue if the name clash...
+            # TODO: smarter path
+            required = required + content.get('required', [])
 
-        # could create issue if the name clash...
-        # TODO: smarter path
-        required = required + content.get('required', [])
+            items = content.get('items')
 
-        items = content.get('items')
+            if ctype == 'array':
+                if items.get('$ref'):
+                    ctypeOut = f'array of {self.refLink(items.get("$ref"))}'
+                elif items.get('type'):
+                    ctypeOut = f'array of {self.typeAndFormat(items)}'
+                else:
+                    ctypeOut = 'array of object'
 
-        if ctype == 'array':
-            if items.get('$ref'):
-                ctypeOut = f'array of {self.refLink(items.get("$ref"))}'
-            elif items.get('type'):
-                ctypeOut = f'array of {self.typeAndFormat(items)}'
-            else:
-                ctypeOut = 'array of object'
+            newPath = path + [name]
+            self.stats.count('rows')
+            body.append(self.html.definitionRow(idRepr(newPath), pathRepr(newPath, required), ctypeOut, details))
 
-        newPath = path + [name]
-        body.append(f'''<tr id="{idRepr(newPath)}">
-          <td>{pathRepr(newPath, required)}</td>
-          <td>{ctypeOut}</td>
-          <td>{details}</td>
-        </tr>''')
+            children = []
+            if ctype == 'object':
+                for n, c in content['properties'].items():
+                    children.append((newPath, n, c, required))
 
-        if ctype == 'object':
-            for n, c in content['properties'].items():
-                self.addTableLine(newPath, body, n, c, required)
+            if ctype == 'array' and items and not items.get('$ref') and items.get("type") == 'object':
+                children.append((newPath, '[0]', content.get('items'), required))
 
-        if ctype == 'array' and items and not items.get('$ref') and items.get("type") == 'object':
-            self.addTableLine(newPath, body, '[0]', content.get('items'), required)
+            if children and limits.maxDepth and len(newPath) > limits.maxDepth:
+                body.append(truncatedRow(limits, 'maxDepth', self.html))
+                continue
+            # the first child is rendered first
+            stack.extend(reversed(children))
+        return True
 
 
 class SwaggerPath():
 
-    def __init__(self, file=None, definitionsUrl='', definitionNames=[], config={}):
+    SECTIONS = ['responseExamples', 'responseTable', 'requestExamples', 'requestCodeExamples', 'parametersTable']
+    # the accepted configuration keys, with the accepted nested keys when they are checked
+    configKeys = dict({
+        'sections': {name: None for name in SECTIONS},
+        'verbs': None,
+        'exampleSeed': None,
+    }, **dict.fromkeys(LIMIT_KEYS))
+    excludeField = frozenset(['type', 'items', 'properties', 'required', '$ref', 'xml', 'schema', 'format', 'name'])
+
+    def __init__(self, file=None, definitionsUrl='', definitionNames=[], config={}, specCache=None, options={}, stats=None,
+            documents=None, plan=None, definitionLinks={}):
         self.defaultFile = file
+        self.stats = nullStats if stats is None else stats
+        # a DirectivePlan already holds the compiled configuration
+        self.config = self.compileConfig(config) if plan is None else plan.settings
+        self.exampleSeed = self.config["exampleSeed"]
+        if self.exampleSeed is None:
+            self.exampleSeed = options.get("exampleSeed", '')
+        self.limits = options.get('limits', DEFAULT_LIMITS).override(self.config)
+        self.output = options.get('output', PRETTY)
+        self.html = self.output.html
+        self.specCache = defaultSpecCache if specCache is None else specCache
+        # resolves the $ref to other files
+        self.resolver = RefResolver(documents or DocumentPool(self.specCache, self.stats))
         self.definitionsUrl = definitionsUrl
         self.definitionNames = definitionNames
+        # name -> url of the page of the site hosting the definition
+        self.definitionLinks = definitionLinks
+        # the paths and verbs matched by a selection directive
+        self.selection = None
 
-        self.excludeField = ['type', 'items', 'properties', 'required', '$ref', 'xml', 'schema', 'format', 'name']
-
+    @staticmethod
+    def compileConfig(config):
         sectionConfig = config.get("sections", {})
     
-        self.config = {
+        return dict({
             "responseExamples": sectionConfig.get("responseExamples", True),
             "responseTable": sectionConfig.get("responseTable", True),
             "requestExamples": sectionConfig.get("requestExamples", True),
             "requestCodeExamples": sectionConfig.get("requestCodeExamples", True), 
             "parametersTable": sectionConfig.get("parametersTable", True),
-            "verbs": config.get("verbs", "all")
-        }
+            "verbs": config.get("verbs", "all"),
+            "exampleSeed": config.get("exampleSeed")
+        }, **{key: config.get(key) for key in LIMIT_KEYS})
 
     # Typical input
     # :swg-path: /my-project"
     # :swg-path: test_swagger.json /users/{userId}
     def handleLine(self, line):
+        return self.render(self.load(line))
+
+    def load(self, line):
+        """
+        Load the swagger file of the directive and return the path
+        """
         content = line.split(' ')
         file = content[1]
-        if not file.endswith('.json'):
+        if not isSpecFile(file):
           file = self.defaultFile
 
         self.path = content[-1]
 
-        with open(file) as json_file:
-            self.data = json.load(json_file)
-            pathDef = self.data['paths'][self.path]
+        if isSelection(self.path):
+            # :swg-path: /pet/* or :swg-path: tag:store, every match is rendered by this directive
+            self.selector = self.path
+            self.spec = self.specCache.load(file, stats=self.stats)
+            self.index = self.spec.index
+            self.data = self.spec.data
+            self.selection = self.index.selectPaths(self.selector)
+            if not self.selection:
+                log.warning(f'{line}: no path of {file} matches {self.selector}')
+            return [self.index.paths[path] for path, _ in self.selection]
+
+        return self.loadPath(file, self.path)
+
+    def loadPath(self, file, path):
+        """
+        Load the swagger file and return one of its paths, the path is not
+        parsed from a directive so it can hold spaces or end with .json
+        """
+        self.path = path
+        self.selection = None
+        self.spec = self.specCache.load(file, paths=[path], stats=self.stats)
+        self.index = self.spec.index
+        self.data = self.spec.data
+        return self.index.paths[path]
+
+    def render(self, pathDef):
+        if self.selection is None:
             return self.pathRepr(pathDef)
+        return joinChunks(self.renderChunks(pathDef))
+
+    def renderChunks(self, pathDef):
+        return list(self.iterChunks(pathDef))
+
+    def iterChunks(self, pathDef):
+        """The rendered paths, one chunk at a time"""
+        if self.selection is None:
+            yield from self.iterPathChunks(pathDef)
+            return
+        for (path, verbs), node in zip(self.selection, pathDef):
+            self.path = path
+            yield from self.iterPathChunks(node, verbs)
+
+    def paths(self):
+        """The paths rendered by this directive"""
+        return [self.path] if self.selection is None else [path for path, _ in self.selection]
+
+    def references(self):
+        """Names of the definitions this directive may link to"""
+        refs = set()
+        for path in self.paths():
+            refs |= self.index.pathRefs.get(path, set())
+        return refs
+
+    def dependencies(self):
+        """
+        The nodes of the swagger file used to render this directive,
+        examples follow every $ref so the whole closure is included
+        """
+        nodes = [('path', path) for path in self.paths()] + [('global', '')]
+        if self.selection is not None:
+            nodes.append(('paths', self.selector))
+        for name in sorted(self.index.closure(self.references())):
+            nodes.append(('definition', name))
+        return nodes
 
-    def pathRepr(self, pathDef):
-        out = []
-        verbs = pathDef.keys()
-        for verb in verbs:
+    def pathRepr(self, pathDef, verbs=None):
+        return joinChunks(self.pathChunks(pathDef, verbs))
+
+    def pathChunks(self, pathDef, verbs=None):
+        """
+        The rendered path as a list of (kind, text) where kind is html
+        for raw HTML and markdown for text that still needs markdown.
+        verbs restricts the rendered operations, like the verbs option.
+        """
+        return list(self.iterPathChunks(pathDef, verbs))
+
+    def iterPathChunks(self, pathDef, verbs=None):
+        """The chunks of pathChunks, each one is rendered when it is needed"""
+        for verb in pathDef.keys():
             if self.config['verbs'] != 'all' and not verb in self.config['verbs']:
                 continue
+            if verbs is not None and verb not in verbs:
+                continue
 
-            out.append(f'''<p class="sw-path">
-                <span class="sw-verb">{verb.upper()}</span>
-                <span class="sw-path-url">{self.path}</span></p>''')
+            yield (HTML, self.html.pathLine(verb.upper(), self.path))
+            self.verb = verb
             verbDef = pathDef[verb]
             summary = verbDef.get('summary')
-            out.append(f'''<p class="sw-summary">{summary}</p>''')
+            yield (HTML, f'''<p class="sw-summary">{summary}</p>''')
             parameters = verbDef.get('parameters', [])
 
             if self.config['parametersTable']:
-                out.append(self.parameters(parameters))
+                with self.stats.section('parameters'):
+                    chunk = (HTML, self.parameters(parameters))
+                yield chunk
 
             if self.config['requestExamples']:
-                out.append(self.requestExamples(verbDef))
+                with self.stats.section('requestExamples'):
+                    chunk = (MARKDOWN, self.requestExamples(verbDef))
+                yield chunk
 
             if self.config['requestCodeExamples']:
-                out.append(self.requestCodeExamples(verb, pathDef, verbDef))
+                with self.stats.section('requestCodeExamples'):
+                    chunk = (MARKDOWN, self.requestCodeExamples(verb, pathDef, verbDef))
+                yield chunk
 
             if self.config['responseTable']:
-                out.append(self.responses(verbDef))
+                with self.stats.section('responses'):
+                    chunk = (HTML, self.responses(verbDef))
+                yield chunk
 
             if self.config['responseExamples']:
-                out.append(self.responsesExamples(verbDef))
-
-
-        return '\n'.join(out)
+                with self.stats.section('responsesExamples'):
+                    chunk = (MARKDOWN, self.responsesExamples(verbDef))
+                yield chunk
 
     def responses(self, verbDef):
         responses = verbDef.get('responses')
@@ -253,12 +501,7 @@ class SwaggerPath():
         for name, content in responses.items():
             out.append(self.response(name, content))
         body = ''.join(out)
-        return f"""<table data-type="sw-table" id="/paths{self.path}/responses">
-        <caption>Responses {producesStr}</caption>
-        <thead><tr><th>Code</th><th>Description</th><th>Body</th></tr></thead>
-        <tbody>{body}</tbody>
-        </table>
-        """
+        return self.html.responsesTable(self.path, producesStr, body)
 
     def responsesExamples(self, verbDef):
         responses = verbDef.get('responses')
@@ -269,14 +512,14 @@ class SwaggerPath():
             schema = content.get('schema')
             if not schema:
                 continue
-            obj = self.responseMap(schema)
+            obj = self.responseMap(schema, f'{self.path} {self.verb} responses {name}')
             if obj is None:
                 continue
             out.append(f'''
 Response example {name}
 
 ```json
-{json.dumps(obj, indent=2)}
+{self.output.example(obj)}
 ```
 ''')
         return '\n'.join(out)
@@ -290,7 +533,7 @@ Response example {name}
 Request example
 
 ```json
-{json.dumps(objOrArray, indent=2)}
+{self.output.example(objOrArray)}
 ```
 '''
 
@@ -301,7 +544,7 @@ Request example
         scheme = self.data.get('schemes', ['https'])[0]
         host = self.data.get('host', 'example.com')
         consumes = verbDef.get('consumes', ['application/json'])[0]
-        data = json.dumps(objOrArray, indent=2).replace("\n", "\\\n")
+        data = self.output.example(objOrArray).replace("\n", "\\\n")
 
         code = f'''curl -i {scheme}://{host}{self.path} \\
 --header "Content-Type: {consumes}" \\
@@ -321,53 +564,53 @@ Request code example
     def response(self, name, response):
         description = response.get('description')
         schema = self.contentType(response) or ''
-        return f'''<tr>
-            <td>{name}</td>
-            <td>{description}</td>
-            <td>{schema}</td>
-        </tr>'''
+        self.stats.count('rows')
+        return self.html.responseRow(name, description, schema)
 
     def parametersTable(self, body):
-        return f"""<table data-type="sw-table" id="/paths{self.path}/parameters">
-        <caption>Parameters</caption>
-        <thead><tr><th>Name</th><th>Type</th><th>Details</th></tr></thead>
-        <tbody>{body}</tbody>
-        </table>
-        """
+        return self.html.parametersTable(self.path, body)
 
     def contentType(self, obj):
         # obj is a Paramteter or a Response
-        schema = obj.get('schema')
-        # seems wrong acording to the spec, but it seems
-        # some decide to shove type and format without schema
-        # https://swagger.io/docs/specification/describing-parameters/
-        if not schema:
-            schema = obj
-        ctype = schema.get('type')
-
-        items = schema.get('items')
-        if ctype == 'array' and items:
-            if schema.get('$ref'):
-                return f'array of {self.refLink(items.get("$ref"))}'
-            else:
-                return f'array of {self.contentType(items)}'
+        prefix = ''
+        while True:
+            schema = obj.get('schema')
+            # seems wrong acording to the spec, but it seems
+            # some decide to shove type and format without schema
+            # https://swagger.io/docs/specification/describing-parameters/
+            if not schema:
+                schema = obj
+            ctype = schema.get('type')
+
+            items = schema.get('items')
+            if ctype == 'array' and items:
+                if schema.get('$ref'):
+                    return f'{prefix}array of {self.refLink(items.get("$ref"))}'
+                # nested arrays
+                prefix = f'{prefix}array of '
+                obj = items
+                continue
 
-        if ctype:
-            f = schema.get('format')
-            if f:
-                return f'{ctype} {f}'
-            return ctype
-        ref = schema.get('$ref')
-        if ref:
-            return self.refLink(ref)
+            if ctype:
+                f = schema.get('format')
+                if f:
+                    return f'{prefix}{ctype} {f}'
+                return f'{prefix}{ctype}'
+            ref = schema.get('$ref')
+            if ref:
+                return f'{prefix}{self.refLink(ref)}'
+            return f'{prefix}None' if prefix else None
 
     def refLink(self, ref):
-        bits = ref.split('/')
-        name = bits[len(bits) - 1]
-        url = f'{self.definitionsUrl}{ref}'
+        self.stats.count('refLinks')
+        name = self.index.refName(ref)
+        anchor = self.index.refAnchor(ref)
+        url = f'{self.definitionsUrl}{anchor}'
         # if the current name is included in the current page, we can ignore definitionsUrl
         if name in self.definitionNames:
-            url = ref
+            url = anchor
+        elif name in self.definitionLinks:
+            url = f'{self.definitionLinks[name]}{anchor}'
 
         return f'<a href="{url}">{name}</a>' 
 
@@ -376,7 +619,7 @@ Request code example
         keys = content.keys()
         for detail in keys:
             if detail not in self.excludeField:
-                labelValue(out, content, detail)
+                labelValue(out, content, detail, self.limits)
 
         return '<br>'.join(out)
 
@@ -386,47 +629,60 @@ Request code example
             out.append(f'<strong>{n["name"]}</strong>' if n.get("required") else n["name"])
         return '.'.join(out).replace('.[0]', '[0]')
 
-    def parameter(self, p, names):
+    def parameter(self, p, names, out=None):
         """
-        Handles one parameter
+        Handles one parameter and the properties nested in it, the rows are
+        added to out. Return False when the table reached maxRows.
         """
-        out = []
-        name = p.get('name') or ''
+        limits = self.limits
+        out = [] if out is None else out
+        stack = [(p, names)]
+        while stack:
+            p, names = stack.pop()
+            if limits.maxRows and len(out) >= limits.maxRows:
+                out.append(truncatedRow(limits, 'maxRows', self.html))
+                return False
+            name = p.get('name') or ''
 
-        where = p.get('in', '')
-        schema = p.get('schema')
+            where = p.get('in', '')
+            schema = p.get('schema')
 
-        if where == 'body' and schema:
-            pass
-            # names.append({ "name": "-", "required": p.get('required') })
-        else:
-            if name:
-                names.append({ "name": name, "required": p.get('required') })
+            names = list(names)
+            if where == 'body' and schema:
+                pass
+                # names.append({ "name": "-", "required": p.get('required') })
+            else:
+                if name:
+                    names.append({ "name": name, "required": p.get('required') })
 
-        outName = self.outNames(names)
-        out.append(f'''<tr>
-            <td>{outName}</td>
-            <td>{self.contentType(p)}</td>
-            <td>{self.details(p)}</td>
-        </tr>''')
+            outName = self.outNames(names)
+            self.stats.count('rows')
+            out.append(self.html.parameterRow(outName, self.contentType(p), self.details(p)))
 
-        ctype = p.get('type') or p.get('schema', {}).get('type')
-        items = p.get('items')
+            ctype = p.get('type') or p.get('schema', {}).get('type')
+            items = p.get('items')
 
-        if ctype == 'object':
-            props = p.get('properties') or p.get('schema') and p.get('schema').get('properties')
-            for key, value in props.items():
-                out.append(self.parameter(value, names + [{'name': key}]))
+            children = []
+            if ctype == 'object':
+                props = p.get('properties') or p.get('schema') and p.get('schema').get('properties')
+                for key, value in (props or {}).items():
+                    children.append((value, names + [{'name': key}]))
 
-        if ctype == 'array' and items and not items.get('$ref'):
-            out.append(self.parameter(items, names=names + [{'name': '[0]'}]))
+            if ctype == 'array' and items and not items.get('$ref'):
+                children.append((items, names + [{'name': '[0]'}]))
 
-        return ''.join(out)
+            if children and limits.maxDepth and len(names) > limits.maxDepth:
+                out.append(truncatedRow(limits, 'maxDepth', self.html))
+                continue
+            # the first child is rendered first
+            stack.extend(reversed(children))
+        return True
 
     def parameters(self, parameters):
         out = []
         for p in parameters:
-            out.append(self.parameter(p, []))
+            if not self.parameter(p, [], out):
+                break
     
         return self.parametersTable(''.join(out))
 
@@ -435,152 +691,330 @@ Request code example
         for p in verbDef.get('parameters', []):
             where = p.get('in', '')
             schema = p.get('schema')
+            location = f'{self.path} {self.verb} parameters {p.get("name")}'
             if where == 'body':
                 if schema:
-                    out = self.requestMap(schema)
+                    out = self.requestMap(schema, location)
                 else:
-                    out[p['name']] = self.requestMap(p)
+                    # examples are shared, copy before adding to it
+                    if isinstance(out, dict):
+                        out = dict(out)
+                    out[p['name']] = self.requestMap(p, location)
             else:
                 pass
     
         return out
     
-    def requestMap(self, content):
-        name = content.get('name')
-
-        ctype = content.get('type') or content.get('schema', {}).get('type')
-        schema = content.get('schema', {})
-        ref = content.get('$ref') or schema.get('$ref')
-
-        if ctype == 'array':
-            items = content.get('items') or content.get('schema', {}).get('items')
-            return [self.requestMap(items)]
-
-        elif ctype == 'object':
-            properties = content.get('properties', {})
-            c = {}
-            for name, ct in properties.items():
-                c[name] = self.requestMap(ct)
-            return c
-        elif ref:
-            defName = ref.split('#/definitions/')[1]
-            if defName in self.data['definitions']:
-                return self.requestMap(
-                    self.data['definitions'][defName])
-        else:
-            return self.getRandomValue(content)
-
-    def getRandomValue(self, content):
-        schema = content.get('schema')
-        if schema:
-            content = schema
-        ctype = content.get('type')
-        format = content.get('format')
-        example = content.get('example')
-        if example:
-            return example
-        enum = content.get('enum')
-        if enum:
-            return enum[0]
-
-        if ctype == 'integer' or ctype == 'number':
-            return 123
-        elif ctype == 'string':
-            if format == 'date':
-                return '2019-07-21'
-            if format == 'date-time':
-                return '2017-07-21T17:32:28Z'
-            if format == 'password':
-                return '*****'
-            if format == 'email':
-                return 'example@example.com'
-            if format == 'uuid':
-                return str(uuid.uuid4())
-            return 'lorem ipsum'
-        elif ctype == 'boolean':
-            return True
-        
-        return ctype
-
-    def responseMap(self, content):
-        name = content.get('name')
-
-        ctype = content.get('type')
-        ref = content.get('$ref')
+    @property
+    def examples(self):
+        return self.spec.examples(self.exampleSeed)
+
+    def requestMap(self, content, location=''):
+        return self.examples.example(content, location, self.stats, self.resolver, limits=self.limits)
+
+    def getRandomValue(self, content, location=''):
+        return self.examples.value(content, location)
+
+    def responseMap(self, content, location=''):
+        return self.examples.example(content, location, self.stats, self.resolver, limits=self.limits)
+
+DIRECTIVES = [
+    (':swg-def: ', SwaggerDefinition),
+    (':swg-path: ', SwaggerPath),
+]
+
+
+class Directive():
+    """A directive line and the indented YAML configuration following it"""
+
+    def __init__(self, handler, line, configLines):
+        self.handler = handler
+        self.line = line
+        self.configLines = configLines
+
+    def file(self, defaultFile):
+        """The swagger file used by the directive"""
+        content = self.line.split(' ')
+        return content[1] if isSpecFile(content[1]) else defaultFile
+
+    def plan(self, cache=planCache):
+        """The compiled configuration, shared by the directives with the same configuration"""
+        return cache.get(self.handler, self.configLines, self.line)
+
+
+def scanDirectives(lines):
+    """
+    Yield the lines of the document, directives and their configuration
+    are grouped into a Directive. The input is read once and never modified.
+    """
+    index = 0
+    total = len(lines)
+    while index < total:
+        line = lines[index]
+        index += 1
+        handler = None
+        for prefix, handlerClass in DIRECTIVES:
+            if line.startswith(prefix):
+                handler = handlerClass
+                break
+        if handler is None:
+            yield line
+            continue
+        configLines = []
+        while index < total and lines[index].startswith('    '):
+            configLines.append(lines[index][4:])
+            index += 1
+        yield Directive(handler, line, configLines)
+
+
+# the pools of renderWorkers, (executor, workers) -> pool shared by every preprocessor
+renderPools = {}
+renderPoolsLock = threading.Lock()
+
+
+def renderPool(executor, workers):
+    """
+    A thread or process pool shared by the markdown instances of the process,
+    MkDocs creates one for each page. The worker processes keep the
+    parsed swagger files for the next pages.
+    """
+    with renderPoolsLock:
+        pool = renderPools.get((executor, workers))
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers) if executor == 'process' else ThreadPoolExecutor(max_workers=workers)
+            renderPools[(executor, workers)] = pool
+        return pool
 
-        if ctype == 'array':
-            items = content.get('items')
-            return [self.responseMap(items)]
-
-        elif ctype == 'object':
-            properties = content.get('properties', {})
-            c = {}
-            for name, content in properties.items():
-                c[name] = self.responseMap(content)
-            return c
-        elif ref:
-            defName = ref.split('#/definitions/')[1]
-            if defName in self.data['definitions']:
-                return self.responseMap(
-                    self.data['definitions'][defName])
-        else:
-            return self.getRandomValue(content)
 
 class SwaggerPreprocessor(Preprocessor):
     """Swagger include Preprocessor"""
 
-    def __init__(self, md, file=None, definitionsUrl=''):
+    def __init__(self, md, file=None, definitionsUrl='', specCache=None, fragmentCache=None, options={},
+            collectStats=False, statsCallback=None, useHtmlStash=False, prefetchWorkers=4,
+            renderWorkers=0, renderExecutor='thread', renderBatchSize=50, locations=None):
         self.defaultFile = file
         self.definitionsUrl = definitionsUrl
+        # a DefinitionLocations of the site the document belongs to
+        self.locations = locations
+        self.definitionLinks = {}
+        # rendering options shared by all the directives
+        self.options = options
+        self.specCache = defaultSpecCache if specCache is None else specCache
+        self.fragmentCache = fragmentCache
+        self.statsCallback = statsCallback or None
+        self.collectStats = collectStats or self.statsCallback is not None
+        # rendered HTML goes to md.htmlStash instead of the markdown source
+        self.useHtmlStash = useHtmlStash
+        # threads parsing the swagger files of a page before rendering (disabled if below 2)
+        self.prefetchWorkers = prefetchWorkers
+        # directives rendered concurrently by a thread or process pool (disabled if below 2)
+        self.renderWorkers = renderWorkers
+        self.renderExecutor = renderExecutor
+        # the minimum number of directives rendered by each task of the pool
+        self.renderBatchSize = max(renderBatchSize, 1)
+        if renderExecutor not in ('thread', 'process'):
+            raise ValueError(f'Unknown renderExecutor {renderExecutor}, use thread or process')
         super(SwaggerPreprocessor, self).__init__(md)
 
-    def getConfig(self, index, lines):
-        yamlOut = []
-        while index < len(lines):
-            line = lines[index]
-            if line.startswith('    '):
-                yamlOut.append(line[4:])
-                del lines[index]
+    def render(self, directive, definitionNames):
+        with self.stats.directive(directive.line) as record:
+            chunks = self.renderDirective(directive, definitionNames)
+            record['bytes'] = sum(len(text) for _, text in chunks)
+        return chunks
+
+    def renderDirective(self, directive, definitionNames):
+        plan = directive.plan()
+        handler = directive.handler(
+            file=self.defaultFile,
+            definitionsUrl=self.definitionsUrl,
+            definitionNames=definitionNames,
+            specCache=self.specCache,
+            options=self.options,
+            stats=self.stats,
+            documents=self.documents,
+            plan=plan,
+            definitionLinks=self.definitionLinks
+        )
+        try:
+            node = handler.load(directive.line)
+        except LOAD_ERRORS as error:
+            raise SpecLoadError(directive.line, directive.file(self.defaultFile), error) from error
+        self.dependencies.add(handler.spec, handler.dependencies())
+        try:
+            return self.renderNode(directive, plan, handler, node, definitionNames)
+        except SpecLoadError as error:
+            # a file referenced by a $ref
+            raise SpecLoadError(directive.line, error.file, error.error) from error
+        finally:
+            for path in handler.resolver.used:
+                self.dependencies.add(self.documents.document(path), [('document', '')])
+
+    def renderNode(self, directive, plan, handler, node, definitionNames):
+        if self.fragmentCache is None:
+            return handler.renderChunks(node)
+
+        # only the definitions linked from this fragment change its links
+        references = handler.references()
+        linked = sorted(references & definitionNames)
+        pages = {name: self.definitionLinks[name] for name in references - definitionNames if name in self.definitionLinks}
+        key = self.fragmentCache.key(handler.spec.digest, directive.line,
+            plan.text, self.definitionsUrl, self.options, linked, pages, 'chunks+files')
+        fragment = self.fragmentCache.get(key)
+        if fragment is not None:
+            fragment = json.loads(fragment)
+            # the other files used through a $ref must not have changed
+            if all(handler.resolver.current(path, digest) for path, digest in fragment['files'].items()):
+                self.stats.count('fragmentCacheHits')
+                return [tuple(chunk) for chunk in fragment['chunks']]
+        chunks = handler.renderChunks(node)
+        self.fragmentCache.set(key, json.dumps({'chunks': chunks, 'files': handler.resolver.used}))
+        return chunks
+
+    def stash(self, chunks):
+        """
+        Lines where each HTML chunk is replaced by a placeholder of md.htmlStash,
+        the block parser then skips the HTML entirely
+        """
+        lines = []
+        for kind, text in chunks:
+            if kind == HTML:
+                if text:
+                    # the whitespace normalization markdown does on the source
+                    text = BLANK_LINE.sub('\n', f'\n{text.expandtabs(self.md.tab_length)}\n')[1:-1]
+                    lines.extend(['', self.md.htmlStash.store(text), ''])
             else:
-                break
-        if len(yamlOut):
-            return yaml.load('\n'.join(yamlOut), Loader=yaml.FullLoader)
-        return {}
+                lines.extend(text.split("\n"))
+        return lines
+
+    def reset(self):
+        """Start the conversion of a new document"""
+        self.dependencies = PageDependencies()
+        self.stats = RenderStats() if self.collectStats else nullStats
+        self.documents = DocumentPool(self.specCache, self.stats)
+
+    def batches(self, directives):
+        """Consecutive directives rendered by one task of the pool"""
+        size = max(self.renderBatchSize, -(-len(directives) // (self.renderWorkers * 4)))
+        return [directives[index:index + size] for index in range(0, len(directives), size)]
+
+    def workerSettings(self):
+        """What a worker process needs to render like this preprocessor"""
+        fragmentCache = self.fragmentCache
+        return {
+            'file': self.defaultFile,
+            'definitionsUrl': self.definitionsUrl,
+            'definitionLinks': self.definitionLinks,
+            'options': self.options,
+            'collectStats': self.collectStats,
+            # an in memory cache stays in this process
+            'fragmentCache': fragmentCache and fragmentCache.directory and (fragmentCache.directory, fragmentCache.maxSize),
+            'specCacheSize': self.specCache.maxSize,
+            'loader': self.specCache.loader,
+            'lazySize': self.specCache.lazySize,
+            'snapshotDir': self.specCache.snapshots and self.specCache.snapshots.directory,
+            'specRoot': self.specCache.root,
+        }
 
-    def run(self, lines):
+    def renderAll(self, directives, definitionNames):
+        """The chunks of each directive, in the order of the document"""
+        batches = self.batches(directives) if self.renderWorkers > 1 else []
+        if len(batches) < 2:
+            return [self.render(directive, definitionNames) for directive in directives]
+
+        pool = renderPool(self.renderExecutor, self.renderWorkers)
         out = []
+        if self.renderExecutor == 'thread':
+            for batch in pool.map(
+                    lambda batch: [self.render(directive, definitionNames) for directive in batch], batches):
+                out.extend(batch)
+            return out
+
+        settings = self.workerSettings()
+        for chunks, dependencies, stats in pool.map(renderBatch,
+                [(settings, definitionNames, batch) for batch in batches]):
+            out.extend(chunks)
+            self.dependencies.update(PageDependencies.fromDict(dependencies))
+            if stats is not None:
+                self.stats.merge(RenderStats.fromDict(stats))
+        return out
 
-        # a list of all definition present in this document
-        definitionNames = []
-        for line in lines:
-            if line.startswith(':swg-def: '):
-                definitionNames.append(SwaggerDefinition().getDefinitionName(line))
-
-        for index, line in enumerate(lines):
-            if line.startswith(':swg-def: '):
-                lineConfig = self.getConfig(index + 1, lines)
-                handler = SwaggerDefinition(
-                    file=self.defaultFile, 
-                    definitionsUrl=self.definitionsUrl,
-                    definitionNames=definitionNames,
-                    config=lineConfig
-                )
-                out = out + handler.handleLine(line).split("\n")
-            elif line.startswith(':swg-path: '):
-                lineConfig = self.getConfig(index + 1, lines)
-                handler = SwaggerPath(
-                    file=self.defaultFile,
-                    definitionsUrl=self.definitionsUrl,
-                    definitionNames=definitionNames,
-                    config=lineConfig
-                )
-                out = out + handler.handleLine(line).split("\n")
+    def run(self, lines):
+        self.reset()
+        self.md.swaggerDependencies = self.dependencies
+        self.md.swaggerStats = self.stats
+        # the other pages of the site hosting a definition, when it is not in this document
+        self.definitionLinks = self.locations.links() if self.locations is not None else {}
+        items = list(scanDirectives(lines))
+
+        # all the definitions present in this document, and the first directive using each file
+        definitionNames = set()
+        files = {}
+        selections = []
+        for item in items:
+            if isinstance(item, Directive):
+                files.setdefault(item.file(self.defaultFile), item)
+                if item.handler is SwaggerDefinition:
+                    name = SwaggerDefinition().getDefinitionName(item.line)
+                    if isSelection(name):
+                        selections.append((item, name))
+                    else:
+                        definitionNames.add(name)
+
+        files.pop(None, None)
+        # worker processes parse the files themselves
+        if not (self.renderWorkers > 1 and self.renderExecutor == 'process'):
+            errors = self.specCache.prefetch(files, self.prefetchWorkers, self.stats)
+            for file, error in errors.items():
+                raise SpecLoadError(files[file].line, file, error) from error
+
+        # the definitions selected by a pattern are in this document too
+        for item, name in selections:
+            file = item.file(self.defaultFile)
+            try:
+                index = self.specCache.load(file, stats=self.stats).index
+            except LOAD_ERRORS as error:
+                raise SpecLoadError(item.line, file, error) from error
+            definitionNames.update(index.matchDefinitions(name))
+
+        rendered = iter(self.renderAll([item for item in items if isinstance(item, Directive)], definitionNames))
+        out = []
+        for item in items:
+            if isinstance(item, Directive):
+                chunks = next(rendered)
+                if self.useHtmlStash:
+                    out.extend(self.stash(chunks))
+                else:
+                    # the lines of joinChunks(chunks), without the joined copy
+                    for _, text in chunks:
+                        out.extend(text.split("\n"))
             else:
-              out.append(line)
+                out.append(item)
 
+        for listener in dependencyListeners:
+            listener(self.dependencies)
+        if self.statsCallback is not None:
+            self.statsCallback(self.stats)
         return out
 
 
+def renderBatch(task):
+    """Render directives in a worker process, with the settings of a SwaggerPreprocessor"""
+    settings, definitionNames, directives = task
+    specCache = defaultSpecCache.view(settings['specCacheSize'], settings['loader'],
+        settings['lazySize'], snapshotCache(settings['snapshotDir']), settings['specRoot'])
+    fragmentCache = None
+    if settings['fragmentCache']:
+        directory, maxSize = settings['fragmentCache']
+        fragmentCache = FragmentCache(directory, maxSize=maxSize)
+    preprocessor = SwaggerPreprocessor(None, file=settings['file'], definitionsUrl=settings['definitionsUrl'],
+        specCache=specCache, fragmentCache=fragmentCache, options=settings['options'], collectStats=settings['collectStats'])
+    preprocessor.reset()
+    preprocessor.definitionLinks = settings['definitionLinks']
+    chunks = [preprocessor.render(directive, definitionNames) for directive in directives]
+    stats = preprocessor.stats.toDict() if preprocessor.stats.enabled else None
+    return chunks, preprocessor.dependencies.toDict(), stats
+
+
 class SwaggerExtension(Extension):
     """Swagger Extension"""
 
@@ -588,14 +1022,75 @@ class SwaggerExtension(Extension):
       self.config = {
           'file' : ['swagger.json', 'The default path of the swagger file'],
           'definitionsUrlRoot' : ['', 'An URL added in front of each definition'],
+          'specCacheSize' : [16, 'How many parsed swagger files are kept in memory by the process wide cache, the largest value of the markdown instances is used (0 parses the files each time)'],
+          'fragmentCacheDir' : ['', 'A directory where rendered directives are cached between builds (disabled if empty)'],
+          'fragmentCacheSize' : [64 * 1024 * 1024, 'The maximum size in bytes of the fragment cache directory'],
+          'fragmentCache' : ['', 'A FragmentCache or MemoryFragmentCache instance used instead of fragmentCacheDir'],
+          'exampleSeed' : ['', 'Seed used to vary generated example values, by default they only depend on the schema location'],
+          'loader' : ['', 'Parser used for swagger files (json, orjson, ujson, yaml), by default it depends on the file extension'],
+          'lazyLoadSize' : [0, 'JSON files of this size in bytes or more are memory mapped and only the needed parts are parsed (disabled if 0)'],
+          'specRoot' : ['', 'Only the swagger files in this directory can be read, including the ones of a $ref (no restriction if empty)'],
+          'snapshotDir' : ['', 'A directory where parsed swagger files are saved so other processes do not parse them again (disabled if empty)'],
+          'collectStats' : [False, 'Record timings and counters of each directive in md.swaggerStats'],
+          'statsCallback' : ['', 'A function called with the stats of each converted document (enables collectStats)'],
+          'useHtmlStash' : [False, 'Store the rendered HTML in md.htmlStash instead of parsing it again as markdown'],
+          'prefetchWorkers' : [4, 'Threads parsing the swagger files of a page concurrently before rendering (disabled if below 2)'],
+          'renderWorkers' : [0, 'Threads or processes rendering the directives of a page concurrently (disabled if below 2)'],
+          'renderExecutor' : ['thread', 'Pool used by renderWorkers: thread or process'],
+          'renderBatchSize' : [50, 'The minimum number of directives rendered by each task of the pool'],
+          'definitionLocations' : ['', 'A DefinitionLocations linking each definition to the page of the site hosting it, before definitionsUrlRoot'],
+          'maxDepth' : [DEFAULT_LIMITS.maxDepth, 'Nesting levels shown in tables and examples (unlimited if 0)'],
+          'maxRows' : [DEFAULT_LIMITS.maxRows, 'Rows of a table (unlimited if 0)'],
+          'maxExampleNodes' : [DEFAULT_LIMITS.maxExampleNodes, 'Values of an example (unlimited if 0)'],
+          'maxEnumValues' : [DEFAULT_LIMITS.maxEnumValues, 'Values of an enum shown in a table (unlimited if 0)'],
+          'outputProfile' : ['pretty', 'Whitespace of the rendered tables and examples: pretty or compact'],
+          'exampleIndent' : ['', 'Indentation of the JSON examples, by default 2, or none with the compact profile'],
+          'exampleSeparators' : ['', 'Item and key separators of the JSON examples, by default ", " and ": ", or "," and ":" with the compact profile'],
       }
       super(SwaggerExtension, self).__init__(**kwargs)
 
+    def configValue(self, key):
+        """The value of an option, None if it is not set"""
+        value = self.getConfig(key)
+        return None if value == '' else value
+
+    def specCacheView(self):
+        """
+        The process wide spec cache with the settings of this extension, the
+        parsed files are shared by every markdown instance, the settings are not
+        """
+        return defaultSpecCache.view(self.getConfig('specCacheSize'), self.getConfig('loader'),
+            self.getConfig('lazyLoadSize'), snapshotCache(self.getConfig('snapshotDir')),
+            self.getConfig('specRoot') or None)
+
     def extendMarkdown(self, md):
         file = self.getConfig('file')
         definitionsUrl = self.getConfig('definitionsUrlRoot')
+        specCache = self.specCacheView()
+        fragmentCache = self.getConfig('fragmentCache') or None
+        if fragmentCache is None and self.getConfig('fragmentCacheDir'):
+            fragmentCache = FragmentCache(self.getConfig('fragmentCacheDir'),
+                maxSize=self.getConfig('fragmentCacheSize'))
+        useHtmlStash = self.getConfig('useHtmlStash')
+        # normalize_whitespace (priority 30) removes the characters of the
+        # stash placeholders, they have to be inserted after it, and before
+        # fenced_code (priority 25) parses the fences of the examples
         md.preprocessors.register(SwaggerPreprocessor(md, file=file,
-            definitionsUrl=definitionsUrl), 'swaggerinclude', 100)
+            definitionsUrl=definitionsUrl, specCache=specCache,
+            fragmentCache=fragmentCache, options={
+                'exampleSeed': self.getConfig('exampleSeed'),
+                'limits': DEFAULT_LIMITS.override(self.getConfigs()),
+                'output': OutputProfile.create(self.getConfig('outputProfile'),
+                    exampleIndent=self.configValue('exampleIndent'),
+                    exampleSeparators=self.configValue('exampleSeparators')),
+            }, collectStats=self.getConfig('collectStats'),
+            statsCallback=self.getConfig('statsCallback'), useHtmlStash=useHtmlStash,
+            prefetchWorkers=self.getConfig('prefetchWorkers'),
+            renderWorkers=self.getConfig('renderWorkers'),
+            renderExecutor=self.getConfig('renderExecutor'),
+            renderBatchSize=self.getConfig('renderBatchSize'),
+            locations=self.getConfig('definitionLocations') or None),
+            'swaggerinclude', 28 if useHtmlStash else 100)
 
 
 def makeExtension(*args, **kwargs):
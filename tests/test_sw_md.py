@@ -1,6 +1,36 @@
 import markdown
 import unittest
-from swaggermarkdown.swaggermarkdown import SwaggerExtension
+import shutil
+import tempfile
+import threading
+import os
+import json
+import io
+import urllib.request
+import urllib.error
+import yaml
+from swaggermarkdown import convertMany
+from swaggermarkdown.swaggermarkdown import SwaggerExtension, SwaggerDefinition, SwaggerPath, writeChunks
+from swaggermarkdown.plan import PlanCache
+from swaggermarkdown.spec import SpecCache, SpecLoadError
+from swaggermarkdown.fragments import FragmentCache, MemoryFragmentCache
+from swaggermarkdown.snapshots import SnapshotCache
+from swaggermarkdown.stats import RenderStats
+from swaggermarkdown.index import SpecIndex
+from swaggermarkdown.locations import DefinitionLocations, relativeUrl
+from swaggermarkdown.cli import renderSpec, renderSpecTo, iterSpec
+from swaggermarkdown.daemon import RenderServer, renderRemote, DaemonError
+from swaggermarkdown.loaders import getLoader, LOADERS
+from swaggermarkdown.offsets import OffsetIndex
+from unittest import mock
+
+try:
+    from mkdocs.config import load_config
+    from mkdocs.commands.build import build
+    from swaggermarkdown.mkdocs_plugin import SwaggerMarkdownPlugin
+except ImportError:
+    SwaggerMarkdownPlugin = None
+from html.parser import HTMLParser
 
 style = '''
 <style>
@@ -155,6 +185,1100 @@ class TestSwaggerExtension(unittest.TestCase):
         converted = md.convert(text)
         self.assertIn('<a href="/types#/definitions/SecondDefinition">SecondDefinition</a>', converted)
 
+    def test_run_does_not_modify_lines(self):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file='tests/test_swagger.json')])
+        lines = [
+            ':swg-path: /my-project',
+            '    verbs:',
+            '      - post',
+            'after',
+        ]
+        out = md.preprocessors['swaggerinclude'].run(lines)
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(out[-1], 'after')
+        self.assertNotIn('    verbs:', out)
+
+    def test_parallel_rendering(self):
+        with open('tests/pet.md') as f:
+            text = f.read()
+        md = markdown.Markdown(extensions=[SwaggerExtension(file='tests/pet_store.json', collectStats=True)])
+        html = md.convert(text)
+        def convert(executor):
+            parallel = markdown.Markdown(extensions=[SwaggerExtension(file='tests/pet_store.json',
+                collectStats=True, renderWorkers=2, renderExecutor=executor, renderBatchSize=1)])
+            self.assertEqual(parallel.convert(text), html)
+            self.assertEqual(parallel.swaggerDependencies.specs, md.swaggerDependencies.specs)
+            self.assertEqual(len(parallel.swaggerStats.directives), len(md.swaggerStats.directives))
+
+        for executor in ('thread', 'process'):
+            convert(executor)
+        # a markdown instance for each page, as MkDocs does, uses the same pools
+        threads = threading.active_count()
+        for executor in ('thread', 'process') * 3:
+            convert(executor)
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_html_stash_output(self):
+        for file, name in [('tests/test_swagger.json', 'tests/test.md'), ('tests/pet_store.json', 'tests/pet.md')]:
+            with open(name) as f:
+                text = f.read()
+            # fenced_code and extra are loaded first by MkDocs
+            for extensions in ([], ['fenced_code'], ['extra']):
+                html = markdown.Markdown(extensions=extensions + [SwaggerExtension(file=file)]).convert(text)
+                md = markdown.Markdown(extensions=extensions + [SwaggerExtension(file=file, useHtmlStash=True)])
+                self.assertEqual(md.convert(text), html)
+                self.assertTrue(md.htmlStash.html_counter > 0)
+                if extensions:
+                    self.assertNotIn('```', html)
+
+
+class TestConvertMany(unittest.TestCase):
+
+    def setUp(self):
+        with open('tests/pet.md') as source:
+            self.docs = [source.read(), '# Title', ':swg-def: Tag\n\n:swg-path: /store/order'] * 3
+        self.expected = [markdown.markdown(text, extensions=['toc', SwaggerExtension(file='tests/pet_store.json')])
+            for text in self.docs]
+
+    def test_in_order(self):
+        self.assertEqual(convertMany(self.docs, extensions=['toc'], file='tests/pet_store.json'), self.expected)
+
+    def test_workers(self):
+        html = convertMany(self.docs, workers=2, chunkSize=2, extensions=['toc'], file='tests/pet_store.json')
+        self.assertEqual(html, self.expected)
+
+
+class TestDirectivePlan(unittest.TestCase):
+
+    def test_plan_is_shared(self):
+        cache = PlanCache()
+        lines = ['verbs:', '  - post']
+        plan = cache.get(SwaggerPath, lines)
+        self.assertIs(cache.get(SwaggerPath, list(lines)), plan)
+        self.assertIsNot(cache.get(SwaggerDefinition, lines), plan)
+        self.assertEqual(plan.settings['verbs'], ['post'])
+        with self.assertRaises(TypeError):
+            plan.settings['verbs'] = 'all'
+
+    def test_unknown_keys(self):
+        with self.assertLogs('swaggermarkdown', 'WARNING') as logs:
+            plan = PlanCache().get(SwaggerPath, ['verb: post', 'sections:', '  responseTables: false'], ':swg-path: /pets')
+        self.assertEqual(plan.unknown, ('verb', 'sections.responseTables'))
+        self.assertIn(':swg-path: /pets', logs.output[0])
+
+    def test_invalid_config(self):
+        with self.assertRaises(ValueError):
+            PlanCache().get(SwaggerPath, ['- post'])
+
+
+class TestExamples(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.dir, 'swagger.json')
+        with open(self.file, 'w') as out:
+            json.dump({
+                'paths': {'/items': {'post': {
+                    'parameters': [{'in': 'body', 'name': 'body', 'schema': {'$ref': '#/definitions/Item'}}],
+                    'responses': {'200': {'description': 'ok', 'schema': {'$ref': '#/definitions/Item'}}},
+                }}},
+                'definitions': {
+                    'Item': {'type': 'object', 'properties': {
+                        'id': {'type': 'string', 'format': 'uuid'},
+                        'created': {'type': 'string', 'format': 'date-time'},
+                    }},
+                    'Node': {'type': 'object', 'properties': {
+                        'name': {'type': 'string'},
+                        'children': {'type': 'array', 'items': {'$ref': '#/definitions/Node'}},
+                        'parent': {'$ref': '#/definitions/Parent'},
+                    }},
+                    'Parent': {'type': 'object', 'properties': {
+                        'node': {'$ref': '#/definitions/Node'},
+                    }},
+                },
+            }, out)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def convert(self, **config):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=self.file, **config)])
+        return md.convert(':swg-path: /items')
+
+    def test_examples_are_deterministic(self):
+        html = self.convert()
+        self.assertEqual(html, self.convert())
+        self.assertIn('2017-07-21T17:32:28Z', html)
+
+    def test_example_seed(self):
+        html = self.convert(exampleSeed='build-1')
+        self.assertEqual(html, self.convert(exampleSeed='build-1'))
+        self.assertNotEqual(html, self.convert())
+        self.assertNotEqual(html, self.convert(exampleSeed='build-2'))
+        self.assertNotIn('2017-07-21T17:32:28Z', html)
+
+    def test_recursive_definitions(self):
+        engine = SpecCache().load(self.file).examples()
+        node = engine.definition('#/definitions/Node')
+        self.assertEqual(node['children'], ['<Node>'])
+        self.assertEqual(node['parent'], {'node': '<Node>'})
+        self.assertIn('Node', engine.memo)
+        # Parent was cut short while Node was expanded, it is not shared
+        self.assertNotIn('Parent', engine.memo)
+        self.assertIs(engine.definition('#/definitions/Parent')['node'], node)
+
+    def test_definition_examples_are_shared(self):
+        engine = SpecCache().load(self.file).examples()
+        self.assertIs(engine.definition('#/definitions/Item'), engine.definition('#/definitions/Item'))
+
+
+class TestExternalRefs(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.dir, 'swagger.json')
+        os.mkdir(os.path.join(self.dir, 'shared'))
+        self.common = os.path.join(self.dir, 'shared', 'common.json')
+        with open(self.file, 'w') as out:
+            json.dump({
+                'paths': {'/items': {'get': {
+                    'responses': {
+                        '200': {'description': 'ok', 'schema': {'$ref': '#/definitions/Item'}},
+                        '400': {'description': 'error', 'schema': {'$ref': 'shared/common.json#/definitions/Error'}},
+                    },
+                }}},
+                'definitions': {
+                    'Item': {'type': 'object', 'properties': {
+                        'error': {'$ref': 'shared/common.json#/definitions/Error'},
+                    }},
+                },
+            }, out)
+        self.writeCommon('not found')
+
+    def writeCommon(self, message):
+        with open(self.common, 'w') as out:
+            json.dump({'definitions': {
+                'Error': {'type': 'object', 'properties': {
+                    'message': {'type': 'string', 'example': message},
+                    'code': {'$ref': '#/definitions/Code'},
+                }},
+                'Code': {'type': 'integer', 'example': 404},
+            }}, out)
+        # a new modification time even on coarse file systems
+        stat = os.stat(self.common)
+        os.utime(self.common, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_external_examples_and_links(self):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=self.file, collectStats=True)])
+        html = md.convert(':swg-path: /items\n\n:swg-def: Item')
+        self.assertIn('not found', html)
+        self.assertIn('404', html)
+        self.assertIn('<a href="#/definitions/Error">Error</a>', html)
+        self.assertIn(os.path.realpath(self.common), md.swaggerDependencies.specs)
+
+    def test_external_file_change(self):
+        cache = os.path.join(self.dir, 'cache')
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=self.file, fragmentCacheDir=cache)])
+        self.assertIn('not found', md.convert(':swg-path: /items'))
+        self.writeCommon('gone')
+        html = md.convert(':swg-path: /items')
+        self.assertIn('gone', html)
+        self.assertNotIn('not found', html)
+
+    def test_missing_external_file(self):
+        os.remove(self.common)
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=self.file)])
+        with self.assertRaises(SpecLoadError) as context:
+            md.convert(':swg-path: /items')
+        self.assertIn(':swg-path: /items', str(context.exception))
+        self.assertIn('common.json', str(context.exception))
+        # the failed walk leaves nothing behind, Item is not taken for a cycle
+        self.writeCommon('back')
+        html = md.convert(':swg-path: /items')
+        self.assertIn('back', html)
+        self.assertNotIn('&lt;Item&gt;', html)
+        self.assertNotIn('<Item>', html)
+
+    def test_local_pointers(self):
+        file = os.path.join(self.dir, 'pointers.json')
+        response = lambda ref: {'description': 'ok', 'schema': {'$ref': ref}}
+        with open(file, 'w') as out:
+            json.dump({
+                'paths': {'/a': {'get': {'responses': {
+                    '200': response('#/definitions/Item'),
+                    '201': response('#/parameters/Item'),
+                }}}},
+                'definitions': {'Item': {'type': 'object', 'properties': {'id': {'type': 'string', 'example': 'abc'}}}},
+                'parameters': {'Item': {'type': 'integer', 'example': 7}},
+            }, out)
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=file)])
+        html = md.convert(':swg-path: /a')
+        self.assertIn('Response example 200</p>\n<p><code>json\n{\n  "id": "abc"\n}</code>', html)
+        self.assertIn('Response example 201</p>\n<p><code>json\n7</code>', html)
+
+    def test_json_pointer(self):
+        index = SpecIndex({'parameters': {'a/b': {'name': 'x'}}, 'list': [1, 2]})
+        self.assertEqual(index.resolve('#/parameters/a~1b'), {'name': 'x'})
+        self.assertEqual(index.resolve('#/list/1'), 2)
+        self.assertIsNone(index.resolve('#/list/5'))
+
+
+class TestSpecIndex(unittest.TestCase):
+
+    def setUp(self):
+        with open('tests/pet_store.json') as spec:
+            self.index = SpecIndex(json.load(spec))
+
+    def test_operations(self):
+        self.assertIn(('/pet/{petId}', 'delete'), self.index.operations)
+        self.assertNotIn(('/pet/{petId}', 'parameters'), self.index.operations)
+
+    def test_references(self):
+        self.assertEqual(self.index.definitionRefs['Pet'], {'Category', 'Tag'})
+        self.assertIn(('definition', 'Pet'), self.index.usedBy['Tag'])
+        self.assertIn(('operation', '/pet', 'post'), self.index.usedBy['Pet'])
+        self.assertEqual(self.index.refName('#/definitions/Pet'), 'Pet')
+        self.assertIs(self.index.resolve('#/definitions/Pet'), self.index.definitions['Pet'])
+        self.assertIsNone(self.index.resolve('common.json#/definitions/Pet'))
+
+
+class TestSelections(unittest.TestCase):
+
+    def setUp(self):
+        with open('tests/pet_store.json') as spec:
+            self.index = SpecIndex(json.load(spec))
+
+    def convert(self, text):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file='tests/pet_store.json', definitionsUrlRoot='/types')])
+        return md.convert(text)
+
+    def test_path_patterns(self):
+        self.assertEqual(self.index.matchPaths('/pet/*'), ['/pet/findByStatus', '/pet/findByTags', '/pet/{petId}'])
+        self.assertEqual(self.index.matchPaths('/pet/**'),
+            ['/pet/{petId}/uploadImage', '/pet', '/pet/findByStatus', '/pet/findByTags', '/pet/{petId}'])
+        self.assertEqual(self.index.matchPaths('/user/log*'), ['/user/login', '/user/logout'])
+        self.assertEqual(self.index.selectPaths('tag:store'),
+            [('/store/order', ['post']), ('/store/order/{orderId}', ['get', 'delete']), ('/store/inventory', ['get'])])
+
+    def test_path_selection(self):
+        html = self.convert(':swg-path: /pet/*')
+        self.assertEqual(html, self.convert(':swg-path: /pet/findByStatus\n\n:swg-path: /pet/findByTags\n\n:swg-path: /pet/{petId}'))
+        html = self.convert(':swg-path: tag:store')
+        self.assertIn('/store/inventory', html)
+        self.assertNotIn('/pet/', html)
+
+    def test_definition_selection(self):
+        html = self.convert(':swg-def: *')
+        self.assertEqual(html.count('<table '), len(self.index.definitions))
+        # every definition is in the page, links are local
+        self.assertNotIn('/types', html)
+
+    def test_empty_selection(self):
+        with self.assertLogs('swaggermarkdown', 'WARNING') as logs:
+            html = self.convert(':swg-path: /typo/*\n\n:swg-def: tag:x')
+        self.assertNotIn('<table', html)
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn(':swg-path: /typo/*: no path of tests/pet_store.json matches /typo/*', logs.output[0])
+        self.assertIn(':swg-def: tag:x: no definition', logs.output[1])
+
+
+
+class TestDefinitionLocations(unittest.TestCase):
+
+    pages = [
+        ('', '# Home'),
+        ('api/pet/', ':swg-def: Pet\n\n:swg-def: Category'),
+        ('api/store.html', ':swg-def: Order*'),
+        ('guide/', ':swg-path: /pet'),
+    ]
+
+    def setUp(self):
+        self.locations = DefinitionLocations('tests/pet_store.json')
+        self.locations.update(self.pages)
+
+    def convert(self, text, page, fragmentCache=None):
+        self.locations.page = page
+        md = markdown.Markdown(extensions=[SwaggerExtension(file='tests/pet_store.json', definitionsUrlRoot='/types',
+            definitionLocations=self.locations, fragmentCache=fragmentCache)])
+        return md.convert(text)
+
+    def test_relative_url(self):
+        self.assertEqual(relativeUrl('api/pet/', 'guide/'), '../api/pet/')
+        self.assertEqual(relativeUrl('api/store.html', 'api/pet.html'), 'store.html')
+        self.assertEqual(relativeUrl('', 'api/pet/'), '../../')
+        self.assertEqual(relativeUrl('api/pet/', 'api/pet/'), '')
+
+    def test_locations(self):
+        self.assertEqual(self.locations.locations, {'Pet': 'api/pet/', 'Category': 'api/pet/', 'Order': 'api/store.html'})
+        self.assertEqual(self.locations.links('api/store.html'), {'Pet': 'pet/', 'Category': 'pet/', 'Order': ''})
+
+    def test_links(self):
+        html = self.convert(':swg-path: /pet', 'guide/')
+        self.assertIn('<a href="../api/pet/#/definitions/Pet">Pet</a>', html)
+        # a definition of the page is still linked locally, the ones of no page with definitionsUrlRoot
+        html = self.convert(':swg-def: Pet\n\n:swg-def: Category', 'api/pet/')
+        self.assertIn('<a href="#/definitions/Category">Category</a>', html)
+        self.assertIn('<a href="/types#/definitions/Tag">Tag</a>', html)
+
+    def test_fragment_cache(self):
+        cache = MemoryFragmentCache()
+        self.assertIn('href="../api/pet/#', self.convert(':swg-path: /pet', 'guide/', cache))
+        self.assertIn('href="pet/#', self.convert(':swg-path: /pet', 'api/store.html', cache))
+
+    def test_incremental_update(self):
+        scans = self.locations.scans
+        self.assertFalse(self.locations.update(self.pages))
+        self.assertEqual(self.locations.scans, scans)
+        # Pet moves to the first page
+        pages = [('', ':swg-def: Pet')] + self.pages[1:]
+        self.assertTrue(self.locations.update(pages))
+        self.assertEqual(self.locations.scans, scans + 1)
+        self.assertEqual(self.locations.locations['Pet'], '')
+
+
+class TestLimits(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.dir, 'swagger.json')
+        # a $ref chain longer than the recursion limit
+        chain = 3000
+        definitions = {f'D{i}': {'type': 'object', 'properties': {
+            'id': {'type': 'integer'}, 'next': {'$ref': f'#/definitions/D{i + 1}'}}} for i in range(chain)}
+        definitions[f'D{chain}'] = {'type': 'object', 'properties': {'id': {'type': 'integer'}}}
+        nested = {'type': 'string'}
+        for i in range(40):
+            nested = {'type': 'object', 'properties': {'a': nested}}
+        definitions['Nested'] = {'type': 'object', 'properties': {'a': nested}}
+        definitions['Wide'] = {'type': 'object', 'properties': {
+            f'p{i}': {'type': 'string', 'enum': list(range(300))} for i in range(30)}}
+        # wider than maxExampleNodes once each property is cut by maxDepth
+        definitions['Deep'] = {'type': 'object', 'properties': {f'p{i}': {'type': 'object', 'properties': {
+            'x': {'type': 'object', 'properties': {'y': {'type': 'string'}}}}} for i in range(50)}}
+        paths = {path: {'get': {'responses': {'200': {'description': 'ok', 'schema': {'$ref': ref}}}}}
+            for path, ref in [('/chain', '#/definitions/D0'), ('/deep', '#/definitions/Deep')]}
+        spec = {'swagger': '2.0', 'definitions': definitions, 'paths': paths}
+        with open(self.file, 'w') as f:
+            json.dump(spec, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def convert(self, text, **config):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=self.file, **config)])
+        return md.convert(text)
+
+    def test_long_ref_chain(self):
+        html = self.convert(':swg-path: /chain')
+        self.assertIn('"next": "... truncated (maxDepth: 32)"', html)
+        html = self.convert(':swg-path: /chain', maxExampleNodes=20)
+        self.assertIn('... truncated (maxExampleNodes: 20)', html)
+        self.assertNotIn('maxDepth', html)
+
+    def test_depth_markers_count_as_nodes(self):
+        html = self.convert(':swg-path: /deep', maxDepth=1, maxExampleNodes=60)
+        self.assertIn('"p0": {\n', html)
+        self.assertIn('... truncated (maxExampleNodes: 60)', html)
+        # every property object and its marker count, about 30 properties fit
+        self.assertLess(html.count('"x": "... truncated (maxDepth: 1)"'), 31)
+
+    def test_table_limits(self):
+        html = self.convert(':swg-def: Nested')
+        self.assertIn('<td colspan="3"><em>... truncated (maxDepth: 32)</em></td>', html)
+        self.assertIn('Nested.a.a.a', html)
+        html = self.convert(':swg-def: Wide', maxRows=10, maxEnumValues=3)
+        self.assertEqual(html.count('<tr id='), 10)
+        self.assertIn('... truncated (maxRows: 10)', html)
+        self.assertIn('[0, 1, 2] ... truncated (maxEnumValues: 3), 300 values', html)
+        self.assertIn('maxEnumValues: 100', self.convert(':swg-def: Wide', maxRows=0))
+        self.assertNotIn('truncated', self.convert(':swg-def: Wide', maxRows=0, maxEnumValues=0))
+
+    def test_directive_limits(self):
+        html = self.convert(':swg-def: Wide\n    maxRows: 5\n\n:swg-def: Nested\n    maxDepth: 0\n', maxRows=100)
+        self.assertIn('... truncated (maxRows: 5)', html)
+        self.assertNotIn('maxDepth', html)
+        self.assertEqual(html.count('<tr id='), 5 + 41)
+
+
+class DomParser(HTMLParser):
+    """The elements and the text of a page, without the whitespace of the source"""
+
+    def __init__(self):
+        super().__init__()
+        self.nodes = []
+
+    def handle_starttag(self, tag, attrs):
+        self.nodes.append(('start', tag, sorted(attrs)))
+
+    def handle_endtag(self, tag):
+        self.nodes.append(('end', tag))
+
+    def handle_data(self, data):
+        # whitespace and shell line continuations do not change an example
+        text = ''.join(data.replace('\\\n', '').split())
+        if text:
+            self.nodes.append(('text', text))
+
+
+def dom(html):
+    parser = DomParser()
+    parser.feed(html)
+    parser.close()
+    return parser.nodes
+
+
+class TestOutputProfile(unittest.TestCase):
+
+    def convert(self, name, file, **config):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=file, **config)])
+        with open(f'tests/{name}.md') as f:
+            return md.convert(f.read())
+
+    def test_compact_dom_is_the_same(self):
+        for name, file in [('test', 'tests/test_swagger.json'), ('pet', 'tests/pet_store.json')]:
+            pretty = self.convert(name, file)
+            compact = self.convert(name, file, outputProfile='compact')
+            self.assertLess(len(compact), len(pretty) * 0.85)
+            self.assertEqual(dom(compact), dom(pretty))
+            self.assertEqual(compact, self.convert(name, file, outputProfile='compact', useHtmlStash=True))
+
+    def test_example_format(self):
+        html = self.convert('pet', 'tests/pet_store.json', outputProfile='compact')
+        self.assertIn('{"id":123,"category":{"id":123,', html)
+        self.assertNotIn('<tr>\n', html)
+        html = self.convert('pet', 'tests/pet_store.json', exampleIndent=1, exampleSeparators=[',', ' = '])
+        self.assertIn('{\n "id" = 123,\n "category" = {', html)
+        with self.assertRaises(ValueError):
+            self.convert('pet', 'tests/pet_store.json', outputProfile='small')
+
+class TestDependencies(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.dir, 'swagger.json')
+        shutil.copy('tests/pet_store.json', self.file)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def edit(self, name, description):
+        with open(self.file) as f:
+            data = json.load(f)
+        data['definitions'][name]['description'] = description
+        with open(self.file, 'w') as f:
+            json.dump(data, f)
+
+    def dependencies(self, text):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=self.file)])
+        md.convert(text)
+        return md.swaggerDependencies
+
+    def test_path_dependencies_follow_refs(self):
+        dependencies = self.dependencies(':swg-path: /pet')
+        nodes = dependencies.specs[os.path.realpath(self.file)]
+        self.assertEqual(set(nodes), {'path:/pet', 'global:', 'definition:Pet',
+            'definition:Category', 'definition:Tag'})
+
+    def test_changed(self):
+        pet = self.dependencies(':swg-path: /pet')
+        order = self.dependencies(':swg-def: Order')
+        self.edit('Tag', 'A new description')
+        self.assertTrue(pet.changed(SpecCache()))
+        self.assertFalse(order.changed(SpecCache()))
+
+    def test_changed_partial(self):
+        pet = self.dependencies(':swg-path: /pet')
+        cache = SpecCache(lazySize=1)
+        self.assertFalse(pet.changed(cache))
+        # only the nodes used by the page are parsed
+        spec = cache.load(self.file, paths=['/pet'])
+        self.assertIsNotNone(spec.selection)
+        self.assertNotIn('Order', spec.index.definitions)
+        self.edit('Tag', 'A new description')
+        self.assertTrue(pet.changed(cache))
+
+
+@unittest.skipUnless(SwaggerMarkdownPlugin, 'mkdocs is not installed')
+class TestMkDocsPlugin(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.spec = os.path.join(self.dir, 'swagger.json')
+        shutil.copy('tests/pet_store.json', self.spec)
+        os.mkdir(os.path.join(self.dir, 'docs'))
+        self.write('index.md', '# Home\n\nSee [the pets](pet.md#/definitions/Pet).\n')
+        self.write('pet.md', '# Pets\n\n## Pet\n\n:swg-def: Pet\n')
+        self.plugin = SwaggerMarkdownPlugin()
+        self.plugin.load_config({})
+        self.plugin.on_startup(command='serve', dirty=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, text):
+        with open(os.path.join(self.dir, 'docs', name), 'w') as out:
+            out.write(text)
+
+    def build(self, **options):
+        with open(os.path.join(self.dir, 'mkdocs.yml'), 'w') as out:
+            yaml.dump({'site_name': 'Site', 'strict': True, 'validation': {'anchors': 'warn'},
+                'markdown_extensions': ['toc', {'swaggermarkdown': dict(options, file=self.spec)}]}, out)
+        config = load_config(os.path.join(self.dir, 'mkdocs.yml'))
+        # the same instance for every build, as in mkdocs serve
+        config.plugins['swaggermarkdown'] = self.plugin
+        # strict mode fails the build on a link to a missing anchor
+        build(config)
+        with open(os.path.join(self.dir, 'site', 'pet', 'index.html')) as page:
+            return page.read()
+
+    def test_reused_page(self):
+        html = self.build()
+        self.assertEqual(self.plugin.reused, {})
+        self.assertEqual(self.build(), html)
+        self.assertEqual(list(self.plugin.reused), ['pet.md'])
+        # the title, table of contents and anchors of the page are restored
+        self.assertIn('<title>Pets - Site</title>', html)
+        self.assertIn('href="#pet"', html)
+
+    def test_extension_cache_settings(self):
+        html = self.build(lazyLoadSize=1, specRoot=self.dir)
+        # the dependencies are checked with the settings of the extension
+        self.assertEqual(self.plugin.specCache.lazySize, 1)
+        self.assertEqual(self.plugin.specCache.root, os.path.realpath(self.dir))
+        self.assertEqual(self.build(lazyLoadSize=1, specRoot=self.dir), html)
+        self.assertEqual(list(self.plugin.reused), ['pet.md'])
+        self.assertIsNotNone(self.plugin.specCache.load(self.spec, definitions=['Pet']).selection)
+
+    def test_spec_edit(self):
+        self.assertIn('doggie', self.build())
+        with open(self.spec) as spec:
+            data = json.load(spec)
+        data['definitions']['Pet']['properties']['name']['example'] = 'kitty'
+        with open(self.spec, 'w') as out:
+            json.dump(data, out)
+        stat = os.stat(self.spec)
+        os.utime(self.spec, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        html = self.build()
+        self.assertEqual(self.plugin.reused, {})
+        self.assertIn('kitty', html)
+        self.assertNotIn('doggie', html)
+
+
+class TestStats(unittest.TestCase):
+
+    def test_stats_disabled(self):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file='tests/pet_store.json')])
+        md.convert(':swg-path: /pet')
+        self.assertFalse(md.swaggerStats.enabled)
+
+    def test_directive_stats(self):
+        collected = []
+        md = markdown.Markdown(extensions=[SwaggerExtension(file='tests/pet_store.json',
+            statsCallback=collected.append)])
+        md.convert(':swg-path: /pet\n\n:swg-def: Pet\n\n:swg-def: Tag')
+        stats = md.swaggerStats
+        self.assertEqual(collected, [stats])
+        self.assertEqual([d['line'] for d in stats.directives], [':swg-path: /pet', ':swg-def: Pet', ':swg-def: Tag'])
+        path = stats.directives[0]
+        self.assertEqual(set(path['sections']), {'parameters', 'requestExamples',
+            'requestCodeExamples', 'responses', 'responsesExamples'})
+        self.assertGreater(path['rows'], 0)
+        self.assertGreater(path['bytes'], 0)
+        self.assertIn('definitionRows', stats.directives[1]['sections'])
+        self.assertGreater(stats.counters['refResolutions'], 0)
+        self.assertGreater(stats.counters['refLinks'], 0)
+        self.assertEqual(stats.counters['specLoads'] + stats.counters['specCacheHits'], 3)
+        self.assertEqual(stats.counters['bytes'], sum(d['bytes'] for d in stats.directives))
+        self.assertIn(':swg-path: /pet', stats.summary())
+
+
+class TestSpecCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.dir, 'swagger.json')
+        shutil.copy('tests/test_swagger.json', self.file)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_parsed_once(self):
+        cache = SpecCache()
+        self.assertIs(cache.load(self.file), cache.load(self.file))
+        self.assertEqual(len(cache.entries), 1)
+
+    def test_reload_when_file_change(self):
+        cache = SpecCache()
+        data = cache.load(self.file)
+        with open(self.file, 'w') as out:
+            out.write('{"definitions": {}}')
+        self.assertEqual(cache.load(self.file).data, {'definitions': {}})
+        self.assertIsNot(cache.load(self.file), data)
+        self.assertEqual(len(cache.entries), 1)
+
+    def test_lru_eviction(self):
+        cache = SpecCache(maxSize=1)
+        cache.load(self.file)
+        cache.load('tests/pet_store.json')
+        self.assertEqual(len(cache.entries), 1)
+        cache.resize(0)
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_views(self):
+        cache = SpecCache()
+        small = cache.view(maxSize=1)
+        large = cache.view(maxSize=4)
+        large.load(self.file)
+        small.load('tests/pet_store.json')
+        # the largest view decides how many files are kept
+        self.assertEqual(len(cache.entries), 2)
+        uncached = cache.view(maxSize=0)
+        self.assertIsNot(uncached.load(self.file), uncached.load(self.file))
+        self.assertEqual(len(cache.entries), 2)
+        # a file parsed by another loader is another entry
+        self.assertIsNot(cache.view(loader='yaml').load(self.file), large.load(self.file))
+        self.assertIs(cache.view(loader='json').load(self.file), cache.view(loader='json').load(self.file))
+
+    def test_settings_of_each_instance(self):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=self.file)])
+        md.convert(':swg-def: FirstDefinition')
+        snapshots = os.path.join(self.dir, 'snapshots')
+        withSnapshots = markdown.Markdown(extensions=[SwaggerExtension(file=self.file,
+            snapshotDir=snapshots, specCacheSize=0)])
+        markdown.Markdown(extensions=[SwaggerExtension(file=self.file, loader='yaml')])
+        # the last instance does not change the settings of the others
+        withSnapshots.convert(':swg-def: FirstDefinition')
+        self.assertEqual(len(os.listdir(snapshots)), 1)
+        stats = RenderStats()
+        md.preprocessors['swaggerinclude'].specCache.load(self.file, stats=stats)
+        self.assertEqual(stats.counters['specCacheHits'], 1)
+
+    def test_shared_spec_is_not_modified(self):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=self.file)])
+        text = ''':swg-def: SecondDefinition
+    properties:
+      name:
+        description: "New description"
+'''
+        self.assertIn('New description', md.convert(text))
+        self.assertNotIn('New description', md.convert(':swg-def: SecondDefinition'))
+
+    def test_prefetch(self):
+        cache = SpecCache()
+        missing = os.path.join(self.dir, 'missing.json')
+        errors = cache.prefetch([self.file, 'tests/pet_store.json', missing])
+        self.assertEqual(len(cache.entries), 2)
+        self.assertIsInstance(errors[missing], OSError)
+
+    def test_broken_spec_names_the_directive(self):
+        broken = os.path.join(self.dir, 'broken.json')
+        with open(broken, 'w') as out:
+            out.write('{"definitions": ')
+        text = f':swg-def: {self.file} FirstDefinition\n\n:swg-def: {broken} Pet'
+        for workers in (4, 0):
+            md = markdown.Markdown(extensions=[SwaggerExtension(file=self.file, prefetchWorkers=workers)])
+            with self.assertRaises(SpecLoadError) as context:
+                md.convert(text)
+            self.assertIn(f':swg-def: {broken} Pet', str(context.exception))
+
+
+
+class TestSnapshotCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.snapshots = os.path.join(self.dir, 'snapshots')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def load(self):
+        """Load the file like a new process would"""
+        cache = SpecCache()
+        cache.snapshots = SnapshotCache(self.snapshots)
+        return cache.load('tests/pet_store.json', stats=self.stats)
+
+    def test_snapshot_is_reused(self):
+        self.stats = RenderStats()
+        spec = self.load()
+        self.assertEqual(len(os.listdir(self.snapshots)), 1)
+        with mock.patch('swaggermarkdown.spec.getLoader') as getLoader:
+            snapshot = self.load()
+        getLoader.assert_not_called()
+        self.assertEqual(self.stats.counters['snapshotHits'], 1)
+        self.assertEqual(snapshot.data, spec.data)
+        self.assertEqual(snapshot.index.state(), spec.index.state())
+        self.assertEqual(snapshot.digest, spec.digest)
+
+    def test_corrupt_and_stale_snapshots_are_removed(self):
+        self.stats = RenderStats()
+        spec = self.load()
+        filename = os.path.join(self.snapshots, os.listdir(self.snapshots)[0])
+        with open(filename, 'r+b') as snapshot:
+            snapshot.truncate(100)
+        self.assertEqual(self.load().data, spec.data)
+        self.assertEqual(self.stats.counters['snapshotHits'], 0)
+        # written again by the load of the corrupt snapshot
+        self.assertGreater(os.path.getsize(filename), 100)
+        stale = os.path.join(self.snapshots, f'{spec.digest}-0.9.0{SnapshotCache.suffix}')
+        shutil.copy(filename, stale)
+        self.load()
+        self.assertFalse(os.path.exists(stale))
+        self.assertEqual(self.stats.counters['snapshotHits'], 1)
+
+    def test_extension_option(self):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file='tests/test_swagger.json',
+            snapshotDir=self.snapshots, specCacheSize=0)])
+        html = md.convert(':swg-def: FirstDefinition')
+        self.assertEqual(len(os.listdir(self.snapshots)), 1)
+        self.assertEqual(md.convert(':swg-def: FirstDefinition'), html)
+
+class TestLoaders(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_yaml_file(self):
+        file = os.path.join(self.dir, 'swagger.yaml')
+        with open('tests/test_swagger.json') as spec:
+            data = json.load(spec)
+        data['definitions']['Friends']['properties']['friends']['items']['properties']['name']['example'] = '2019-07-21'
+        with open(file, 'w') as out:
+            # an unquoted date, as it would be written by hand
+            out.write(yaml.dump(data).replace("'2019-07-21'", '2019-07-21'))
+        md = markdown.Markdown(extensions=[SwaggerExtension()])
+        converted = md.convert(f':swg-path: {file} /my-project')
+        self.assertIn('<td>array of <a href="#/definitions/Friends">Friends</a></td>', converted)
+        self.assertIn('"name": "2019-07-21"', converted)
+
+    def test_loader_choice(self):
+        self.assertIs(getLoader('swagger.yml'), LOADERS['yaml'])
+        self.assertIs(getLoader('swagger.yml', 'json'), LOADERS['json'])
+        with self.assertRaises(ValueError):
+            getLoader('swagger.json', 'xml')
+        raw = open('tests/pet_store.json', 'rb').read()
+        for name, loader in LOADERS.items():
+            self.assertEqual(loader(raw), json.loads(raw), name)
+
+
+class TestOffsetIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.dir, 'swagger.json')
+        shutil.copy('tests/pet_store.json', self.file)
+        with open(self.file) as spec:
+            self.data = json.load(spec)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_offsets(self):
+        index = OffsetIndex(self.file)
+        for name, definition in self.data['definitions'].items():
+            self.assertEqual(index.parse('definitions', name), definition)
+        for name, path in self.data['paths'].items():
+            self.assertEqual(index.parse('paths', name), path)
+        self.assertEqual(index.parse('global', 'host'), self.data['host'])
+        index.close()
+        self.assertTrue(os.path.exists(self.file + '.offsets.json'))
+
+    def test_partial(self):
+        index = OffsetIndex(self.file)
+        data = index.partial(paths=['/pet'])
+        self.assertEqual(list(data['paths']), ['/pet'])
+        self.assertEqual(set(data['definitions']), {'Pet', 'Category', 'Tag'})
+        self.assertEqual(data['host'], self.data['host'])
+        index.close()
+
+    def test_sidecar_rebuilt_when_file_change(self):
+        OffsetIndex(self.file).close()
+        with open(self.file, 'w') as out:
+            json.dump({'definitions': {'Other': {'type': 'string'}}}, out)
+        index = OffsetIndex(self.file)
+        self.assertEqual(list(index.offsets['definitions']), ['Other'])
+        index.close()
+
+    def test_lazy_rendering(self):
+        md = markdown.Markdown(extensions=[SwaggerExtension(file=self.file)])
+        text = ':swg-path: /pet\n\n:swg-def: Pet'
+        expected = md.convert(text)
+        cache = SpecCache(lazySize=1)
+        lazy = markdown.Markdown(extensions=[SwaggerExtension(file=self.file)])
+        lazy.preprocessors['swaggerinclude'].specCache = cache
+        self.assertEqual(lazy.convert(text), expected)
+        self.assertIn(self.file, cache.offsets)
+        self.assertNotIn('Order', cache.load(self.file, definitions=['Pet']).index.definitions)
+
+    def test_one_entry_per_partial_file(self):
+        cache = SpecCache(maxSize=2, lazySize=1)
+        pet = cache.load(self.file, paths=['/pet'])
+        grown = cache.load(self.file, definitions=['Order'])
+        self.assertEqual(len(cache.entries), 1)
+        self.assertEqual(set(grown.index.paths), {'/pet'})
+        self.assertIn('Pet', grown.index.definitions)
+        # the selections already parsed share the entry and its example engines
+        self.assertIsNot(grown, pet)
+        self.assertIs(cache.load(self.file, paths=['/pet']), grown)
+        self.assertIs(cache.load(self.file, definitions=['Order', 'Pet']).examples(), grown.examples())
+        # a full parse covers every selection
+        full = cache.load(self.file)
+        self.assertIs(cache.load(self.file, definitions=['User']), full)
+        self.assertEqual(len(cache.entries), 1)
+
+    def test_replaced_index_stays_readable(self):
+        cache = SpecCache(lazySize=1)
+        cache.load(self.file, paths=['/pet'])
+        # another thread still parsing the previous version of the file
+        previous = cache.offsets[self.file]
+        os.utime(self.file, ns=(0, 0))
+        cache.load(self.file, paths=['/pet'])
+        self.assertIsNot(cache.offsets[self.file], previous)
+        self.assertEqual(previous.parse('definitions', 'Pet'), self.data['definitions']['Pet'])
+
+
+class TestFragmentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def convert(self, text):
+        md = markdown.Markdown(extensions=[SwaggerExtension(
+            file='tests/test_swagger.json', fragmentCacheDir=self.dir)])
+        return md.convert(text)
+
+    def test_rebuild_skips_rendering(self):
+        text = ':swg-def: FirstDefinition\n\n:swg-path: /my-project'
+        first = self.convert(text)
+        with mock.patch('swaggermarkdown.swaggermarkdown.SwaggerDefinition.definitionTable') as table, \
+                mock.patch('swaggermarkdown.swaggermarkdown.SwaggerPath.pathRepr') as path:
+            self.assertEqual(self.convert(text), first)
+            table.assert_not_called()
+            path.assert_not_called()
+
+    def test_page_definitions_are_part_of_the_key(self):
+        alone = self.convert(':swg-def: FirstDefinition')
+        self.assertIn('<a href="#/definitions/SecondDefinition">', alone)
+        md = markdown.Markdown(extensions=[SwaggerExtension(file='tests/test_swagger.json',
+            fragmentCacheDir=self.dir, definitionsUrlRoot='/types')])
+        self.assertIn('<a href="/types#/definitions/SecondDefinition">',
+            md.convert(':swg-def: FirstDefinition'))
+
+    def test_size_limit_and_clear(self):
+        cache = FragmentCache(self.dir, maxSize=10)
+        cache.set(cache.key('a'), 'x' * 8)
+        os.utime(cache.filename(cache.key('a')), (0, 0))
+        cache.set(cache.key('b'), 'y' * 8)
+        self.assertIsNone(cache.get(cache.key('a')))
+        self.assertEqual(cache.get(cache.key('b')), 'y' * 8)
+        cache.invalidate(cache.key('b'))
+        self.assertIsNone(cache.get(cache.key('b')))
+        cache.set(cache.key('c'), 'z')
+        cache.clear()
+        self.assertEqual(os.listdir(self.dir), [])
+
+    def test_memory_cache(self):
+        cache = MemoryFragmentCache(maxSize=10)
+        cache.set(cache.key('a'), 'x' * 8)
+        cache.set(cache.key('b'), 'y' * 8)
+        self.assertIsNone(cache.get(cache.key('a')))
+        self.assertEqual(cache.get(cache.key('b')), 'y' * 8)
+        cache.set(cache.key('b'), 'z')
+        self.assertEqual(cache.size, 1)
+        cache.clear()
+        self.assertIsNone(cache.get(cache.key('b')))
+
+
+class TestRenderCommand(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def read(self, *path):
+        with open(os.path.join(self.dir, *path)) as f:
+            return f.read()
+
+    def test_render_by_tag(self):
+        written = renderSpec('tests/pet_store.json', self.dir, workers=1)
+        self.assertEqual([os.path.basename(f) for f in written],
+            ['pet.md', 'store.md', 'user.md', 'definitions.md'])
+        pet = self.read('pet.md')
+        self.assertIn('## POST /pet/{petId}/uploadImage', pet)
+        self.assertIn('<a href="definitions.md#/definitions/Pet">Pet</a>', pet)
+        self.assertIn('<a href="#/definitions/Category">Category</a>', self.read('definitions.md'))
+
+    def test_process_pool_output_is_identical(self):
+        renderSpec('tests/pet_store.json', os.path.join(self.dir, 'serial'), split='operation', workers=1)
+        renderSpec('tests/pet_store.json', os.path.join(self.dir, 'pool'), split='operation', workers=2, chunkSize=3)
+        files = sorted(os.listdir(os.path.join(self.dir, 'serial')))
+        self.assertIn('delete-pet-petId.md', files)
+        self.assertEqual(files, sorted(os.listdir(os.path.join(self.dir, 'pool'))))
+        for name in files:
+            self.assertEqual(self.read('serial', name), self.read('pool', name))
+
+    def test_file_name_collisions(self):
+        file = os.path.join(self.dir, 'swagger.json')
+        operation = lambda tag: {'tags': [tag], 'responses': {'200': {'description': 'ok'}}}
+        with open(file, 'w') as out:
+            json.dump({'swagger': '2.0', 'paths': {
+                '/a-b': {'get': operation('Pet Store')},
+                '/a/b': {'get': operation('pet-store')},
+                '/c': {'get': operation('definitions')},
+            }}, out)
+        written = renderSpec(file, os.path.join(self.dir, 'tag'), workers=1)
+        self.assertEqual([os.path.basename(f) for f in written], ['Pet-Store.md', 'pet-store-2.md', 'definitions-2.md'])
+        self.assertIn('# pet-store\n', self.read('tag', 'pet-store-2.md'))
+        written = renderSpec(file, os.path.join(self.dir, 'operation'), split='operation', workers=1)
+        self.assertEqual([os.path.basename(f) for f in written], ['get-a-b.md', 'get-a-b-2.md', 'get-c.md'])
+        self.assertIn('# GET /a/b\n', self.read('operation', 'get-a-b-2.md'))
+
+    def test_names_unlike_directives(self):
+        # a directive would read the path as a swagger file, or cut it at the space
+        file = os.path.join(self.dir, 'swagger.json')
+        with open(file, 'w') as out:
+            json.dump({'swagger': '2.0', 'paths': {
+                '/docs/openapi.json': {'get': {'responses': {'200': {'description': 'ok'}}}},
+                '/a b': {'get': {'responses': {'200': {'description': 'ok', 'schema': {'$ref': '#/definitions/A B'}}}}},
+            }, 'definitions': {'A B': {'properties': {'id': {'type': 'integer'}}}}}, out)
+        written = renderSpec(file, os.path.join(self.dir, 'pages'), split='operation', workers=1)
+        self.assertIn('<span class="sw-path-url">/docs/openapi.json</span>', self.read('pages', 'get-docs-openapi-json.md'))
+        self.assertIn('<span class="sw-path-url">/a b</span>', self.read('pages', 'get-a-b.md'))
+        self.assertIn('A B.id', self.read('pages', 'definitions.md'))
+        # and so would the document of iterSpec
+        stream = io.StringIO()
+        renderSpecTo(stream, file, split='operation')
+        self.assertEqual(stream.getvalue(), ''.join(
+            self.read('pages', os.path.basename(f)).replace('definitions.md#', '#') for f in written))
+
+    def test_render_to_stream(self):
+        stream = io.StringIO()
+        size = renderSpecTo(stream, 'tests/pet_store.json')
+        document = stream.getvalue()
+        self.assertEqual(size, len(document))
+        # the pages of renderSpec in one document
+        written = renderSpec('tests/pet_store.json', self.dir, workers=1, definitionsUrl='')
+        self.assertEqual(document, ''.join(self.read(os.path.basename(f)) for f in written))
+        self.assertIn('<a href="#/definitions/Pet">Pet</a>', document)
+        # one operation or definition at a time
+        self.assertLess(max(len(text) for text in iterSpec('tests/pet_store.json')), len(document) / 10)
+
+    def test_chunks(self):
+        handler = SwaggerPath(file='tests/pet_store.json')
+        pathDef = handler.load(':swg-path: /pet/{petId}')
+        chunks = handler.iterChunks(pathDef)
+        self.assertEqual(next(chunks)[0], 'html')
+        stream = io.StringIO()
+        writeChunks(stream, handler.iterChunks(pathDef))
+        self.assertEqual(stream.getvalue(), handler.render(pathDef))
+
+
+
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        # in the root of the daemon, the current directory
+        self.dir = tempfile.mkdtemp(dir='tests')
+        self.file = os.path.join(self.dir, 'swagger.json')
+        shutil.copy('tests/test_swagger.json', self.file)
+        # the watcher is polled by the tests
+        self.server = RenderServer(port=0, interval=3600)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.dir)
+
+    def test_render(self):
+        with open('tests/pet.md') as f:
+            text = f.read()
+        config = {'file': 'tests/pet_store.json'}
+        expected = markdown.Markdown(extensions=['toc', SwaggerExtension(**config)]).convert(text)
+        for _ in range(2):
+            self.assertEqual(renderRemote(text, self.server.url, extensions=['toc'], config=config), expected)
+        status = self.server.renderer.status()
+        self.assertEqual(status['renders'], 2)
+        self.assertEqual(status['pages'], 1)
+        self.assertGreater(status['fragments'], 0)
+        # the directives are taken from the fragment cache
+        edited = text.replace('# API paths', '# Paths')
+        self.assertEqual(renderRemote(edited, self.server.url, extensions=['toc'], config=config),
+            markdown.Markdown(extensions=['toc', SwaggerExtension(**config)]).convert(edited))
+
+    def test_render_fenced_code(self):
+        # the examples are fenced, the stash of the daemon must not leave them raw
+        config = {'file': 'tests/pet_store.json'}
+        for extensions in (['fenced_code'], ['extra']):
+            html = renderRemote(':swg-path: /pet\n', self.server.url, extensions=extensions, config=config)
+            self.assertNotIn('```', html)
+            self.assertEqual(html, markdown.Markdown(
+                extensions=extensions + [SwaggerExtension(**config)]).convert(':swg-path: /pet\n'))
+
+    def test_modified_spec(self):
+        config = {'file': self.file}
+        self.assertIn('FirstDefinition', renderRemote(':swg-def: FirstDefinition', self.server.url, config=config))
+        with open(self.file) as f:
+            spec = json.load(f)
+        spec['definitions']['FirstDefinition']['properties']['renamed'] = {'type': 'string'}
+        with open(self.file, 'w') as f:
+            json.dump(spec, f)
+        os.utime(self.file, ns=(0, 0))
+        self.assertEqual(self.server.watcher.poll(), [os.path.realpath(self.file)])
+        self.assertEqual(self.server.watcher.poll(), [])
+        self.assertIn('FirstDefinition.renamed', renderRemote(':swg-def: FirstDefinition', self.server.url, config=config))
+
+    def test_errors(self):
+        with self.assertRaises(DaemonError) as context:
+            renderRemote(':swg-def: Missing', self.server.url, config={'file': self.file})
+        self.assertIn('KeyError', str(context.exception))
+        with self.assertRaises(DaemonError) as context:
+            renderRemote(':swg-def: Pet', self.server.url, config={'file': os.path.join(self.dir, 'missing.json')})
+        self.assertIn('unable to load', str(context.exception))
+        with self.assertRaises(DaemonError):
+            renderRemote('text', 'http://127.0.0.1:1')
+
+    def test_client_restrictions(self):
+        outside = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, outside)
+        shutil.copy(self.file, outside)
+        for extensions, config, message in [
+                (['toc', 'os'], {}, 'extensions not allowed: os'),
+                ([], {'snapshotDir': outside, 'fragmentCacheDir': outside}, 'configuration not allowed: fragmentCacheDir, snapshotDir'),
+                ([], {'file': os.path.join(outside, 'swagger.json')}, 'is outside of'),
+            ]:
+            with self.assertRaises(DaemonError) as context:
+                renderRemote(':swg-def: FirstDefinition', self.server.url, extensions=extensions, config=config)
+            self.assertIn(message, str(context.exception))
+        # a $ref to another file is checked too
+        file = os.path.join(self.dir, 'ref.json')
+        with open(file, 'w') as f:
+            json.dump({'paths': {'/a': {'get': {'responses': {'200': {'description': 'ok',
+                'schema': {'$ref': f'{outside}/swagger.json#/definitions/Friends'}}}}}}}, f)
+        with self.assertRaises(DaemonError) as context:
+            renderRemote(f':swg-path: {file} /a', self.server.url)
+        self.assertIn('is outside of', str(context.exception))
+        self.assertEqual(os.listdir(outside), ['swagger.json'])
+
+    def test_json_only(self):
+        # a form a web page can post to any origin
+        request = urllib.request.Request(f'{self.server.url}/render', data=b'text=x',
+            headers={'Content-Type': 'application/x-www-form-urlencoded'})
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            urllib.request.urlopen(request, timeout=10)
+        self.assertEqual(context.exception.code, 415)
+        self.assertEqual(self.server.renderer.status()['renders'], 0)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file